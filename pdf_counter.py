@@ -1,23 +1,39 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from openpyxl import Workbook
-import pandas as pd
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import datetime
+import multiprocessing
 import os
+import subprocess
 import sys
+import zipfile
 from pathlib import Path
 
+from utils import metrics
+from utils.archive import Archive
+from utils.fingerprint import is_current, report_fingerprint, report_properties
+from utils.jobs import JobQueue
+from utils.pool import WarmPool
+from utils.preview import PREVIEW_TIMEOUT, preview_file
+from utils.schedule import enrich_results, extract_scheduled, prefetch, reusable
+from utils.sources import archive_members, display_name, is_archive, source_mtime, split_member
 from utils.tree import CostcoTree, pencil
+from utils.viewer import ResultViewer
 
 class PDFPageCounter:
     def __init__(self, root):
         self.root = root
         self.root.title("Costco PDFs Analyzer")
-        self.root.geometry("700x550")
+        self.root.geometry("760x760")
 
         # Variables
-        date = pd.Timestamp.now()
+        date = datetime.date.today()
         self.current_month_str = date.strftime("%B %Y")
         self.pdf_files = []
+        self.previews = {}
+        self.preview_jobs = []
+        self.last_tables = []
+        # (path, mtime) -> extraction future, started as soon as a file is added
+        self.prefetched = {}
         self.output_filename = tk.StringVar(value=f"{self.current_month_str}_costco_output.xlsx")
 
         # Configure style
@@ -26,6 +42,26 @@ class PDFPageCounter:
         # Create GUI
         self.create_widgets()
 
+        # Worker pool is shared by every Generate click; start it once the window is up
+        self.pool = WarmPool(dir_path="costco")
+        self.jobs = JobQueue(self.pool, self.write_job)
+        self.reported_jobs = set()
+        self.root.after(500, self.pool.start)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        running = [job for job in self.jobs.jobs if not job.finished]
+        if running and not messagebox.askyesno(
+            "Jobs Running", f"{len(running)} queued report(s) haven't finished. Quit anyway?"
+        ):
+            return
+        for job in running:
+            self.jobs.cancel(job)
+        self.status_label.config(text="Shutting down...")
+        self.root.update()
+        self.pool.shutdown()
+        self.root.destroy()
+
     def setup_styles(self):
         self.style = ttk.Style()
         self.style.theme_use('clam')
@@ -44,7 +80,7 @@ class PDFPageCounter:
         # Description
         desc_label = tk.Label(
             self.root,
-            text="Upload up to 25 PDF files to generate costco report",
+            text="Upload up to 25 PDF, CSV or XLSX remittances to generate costco report",
             font=("Arial", 13),
             fg="#7f8c8d"
         )
@@ -79,7 +115,7 @@ class PDFPageCounter:
         # File operation buttons
         ttk.Button(
             file_btn_frame,
-            text="Add PDF Files",
+            text="Add Files",
             command=self.add_pdf_files,
             width=15
         ).pack(side=tk.LEFT, padx=(0, 10))
@@ -96,8 +132,29 @@ class PDFPageCounter:
             text="Remove Selected",
             command=self.remove_selected,
             width=15
+        ).pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Button(
+            file_btn_frame,
+            text="Preview",
+            command=self.preview_files,
+            width=10
         ).pack(side=tk.LEFT)
 
+        ttk.Button(
+            file_btn_frame,
+            text="Store Lookup...",
+            command=self.store_lookup,
+            width=15
+        ).pack(side=tk.RIGHT)
+
+        ttk.Button(
+            file_btn_frame,
+            text="View Results",
+            command=self.view_results,
+            width=12
+        ).pack(side=tk.RIGHT, padx=(0, 10))
+
         # Output configuration frame
         output_frame = tk.Frame(self.root)
         output_frame.pack(pady=15, padx=20, fill="x")
@@ -170,8 +227,10 @@ class PDFPageCounter:
         self.file_count_label.pack()
 
         # Generate button
+        generate_frame = tk.Frame(self.root)
+        generate_frame.pack(pady=(15, 5))
         generate_btn = tk.Button(
-            self.root,
+            generate_frame,
             text="Generate Excel Report",
             command=self.generate_report,
             fg="#1c8046",
@@ -182,7 +241,48 @@ class PDFPageCounter:
             relief=tk.RAISED,
             cursor="hand2"
         )
-        generate_btn.pack(pady=20)
+        generate_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Button(
+            generate_frame,
+            text="Add to Queue",
+            command=self.queue_job,
+            width=15
+        ).pack(side=tk.LEFT)
+
+        # Report queue: one job per file set / output, run in the background
+        jobs_frame = tk.LabelFrame(self.root, text="Report queue", font=("Arial", 11))
+        jobs_frame.pack(padx=20, pady=5, fill="x")
+
+        self.jobs_tree = ttk.Treeview(
+            jobs_frame,
+            columns=("job", "output", "files", "status", "time"),
+            show="headings",
+            height=4
+        )
+        for column, heading, width in (
+            ("job", "#", 40), ("output", "Output", 300), ("files", "Files", 60),
+            ("status", "Status", 170), ("time", "Time", 70),
+        ):
+            self.jobs_tree.heading(column, text=heading)
+            self.jobs_tree.column(column, width=width, anchor=tk.W)
+        self.jobs_tree.pack(fill="x", padx=5, pady=(5, 0))
+        self.jobs_tree.bind("<Double-1>", lambda e: self.open_job())
+
+        jobs_btn_frame = tk.Frame(jobs_frame)
+        jobs_btn_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Button(jobs_btn_frame, text="Cancel Job", command=self.cancel_job, width=12).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(jobs_btn_frame, text="Open Report", command=self.open_job, width=12).pack(side=tk.LEFT)
+        self.parallel_jobs = tk.IntVar(value=1)
+        self.parallel_jobs.trace_add("write", lambda *args: self.set_parallel_jobs())
+        tk.Spinbox(
+            jobs_btn_frame,
+            from_=1,
+            to=os.cpu_count() or 1,
+            width=3,
+            textvariable=self.parallel_jobs
+        ).pack(side=tk.RIGHT)
+        tk.Label(jobs_btn_frame, text="Jobs at once:").pack(side=tk.RIGHT, padx=(0, 5))
 
         # Status label
         self.status_label = tk.Label(
@@ -235,36 +335,62 @@ class PDFPageCounter:
             self.save_location.set(directory)
 
     def add_pdf_files(self):
-        # Open file dialog for PDF files
+        # Open file dialog for PDF files, CSV/XLSX exports of the same remittances, or .zip batches
         files = filedialog.askopenfilenames(
-            title="Select PDF Files",
-            filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
+            title="Select Remittance Files",
+            filetypes=[
+                ("Remittances", "*.pdf *.csv *.xlsx *.zip"),
+                ("PDF files", "*.pdf"),
+                ("CSV/Excel exports", "*.csv *.xlsx"),
+                ("ZIP archives", "*.zip"),
+                ("All files", "*.*"),
+            ]
         )
 
-        # Check if adding these files would exceed limit
-        if len(self.pdf_files) + len(files) > 25:
+        # Archives are read in place; every remittance inside becomes its own entry
+        entries = []
+        for file in files:
+            if not is_archive(file):
+                entries.append(file)
+                continue
+            try:
+                members = archive_members(file)
+            except (OSError, zipfile.BadZipFile) as e:
+                messagebox.showerror("Error", f"Could not read {os.path.basename(file)}:\n{e}")
+                continue
+            if not members:
+                messagebox.showwarning("Empty Archive", f"No PDF/CSV/XLSX files found in {os.path.basename(file)}.")
+            entries.extend(members)
+
+        # Check if adding these files would exceed limit (archive members don't count,
+        # a .zip is how large batches come in)
+        loose = [e for e in entries if split_member(e)[1] is None]
+        if self.loose_file_count() + len(loose) > 25:
             messagebox.showwarning(
                 "Limit Exceeded",
-                f"You can only select up to 25 files. You already have {len(self.pdf_files)} files selected."
+                f"You can only select up to 25 files. You already have {self.loose_file_count()} files selected.\n"
+                f"Put larger batches in a .zip archive."
             )
             return
 
         # Add new files
         new_files_added = 0
-        for file in files:
+        for file in entries:
             self.pdf_files.append(file)
-            filename = os.path.basename(file)
-            self.file_listbox.insert(tk.END, filename)
+            self.file_listbox.insert(tk.END, self.file_label(file))
             new_files_added += 1
 
         # Update file count
         self.update_file_count()
 
         if new_files_added > 0:
-            self.status_label.config(text=f"Added {new_files_added} PDF file(s)")
+            self.status_label.config(text=f"Added {new_files_added} file(s)")
+            self.prefetch_files(entries)
 
     def clear_files(self):
         self.pdf_files.clear()
+        self.previews.clear()
+        self.discard_prefetched()
         self.file_listbox.delete(0, tk.END)
         self.update_file_count()
         self.status_label.config(text="All files cleared")
@@ -276,15 +402,100 @@ class PDFPageCounter:
 
         for index in reversed(selected_indices):
             self.file_listbox.delete(index)
-            del self.pdf_files[index]
+            removed = self.pdf_files.pop(index)
+            if removed not in self.pdf_files:
+                self.previews.pop(removed, None)
 
+        self.discard_prefetched()
         self.update_file_count()
         if removed_count > 0:
             self.status_label.config(text=f"Removed {removed_count} file(s)")
 
+    def prefetch_files(self, files):
+        """Start parsing in the background so Generate only has to write the report"""
+        self.discard_prefetched()
+        todo = [f for f in files if (f, source_mtime(f)) not in self.prefetched]
+        if not todo:
+            return
+        try:
+            futures = prefetch(self.pool, todo)
+        except Exception as e:
+            print(f"Could not start background extraction: {e}")
+            return
+        for f, future in futures.items():
+            self.prefetched[(f, source_mtime(f))] = future
+
+    def discard_prefetched(self):
+        """Drop results for files no longer in the list, changed on disk since they were parsed, or that failed"""
+        for key in list(self.prefetched):
+            path, mtime = key
+            if path not in self.pdf_files or mtime != source_mtime(path) or not reusable(self.prefetched[key]):
+                self.prefetched.pop(key).cancel()
+
+    def file_label(self, file):
+        preview = self.previews.get(file)
+        if preview is None:
+            return display_name(file)
+        if isinstance(preview, Exception):
+            return f"{display_name(file)}  ·  preview failed: {preview}"
+        return str(preview)
+
+    def preview_files(self):
+        """Date, payment number, pages and total from the first/last page of each file"""
+        pending = {f for f, _ in self.preview_jobs}
+        todo = [f for f in dict.fromkeys(self.pdf_files) if f not in self.previews and f not in pending]
+        if not todo and not pending:
+            self.show_preview_summary()
+            return
+        self.preview_jobs.extend(
+            (f, self.pool.submit_next(preview_file, f, timeout=PREVIEW_TIMEOUT, label=f)) for f in todo
+        )
+        self.status_label.config(text=f"Previewing {len(self.preview_jobs)} file(s)...")
+        if not pending:
+            self.root.after(50, self.poll_previews)
+
+    def poll_previews(self):
+        running = []
+        for file, future in self.preview_jobs:
+            if not future.done():
+                running.append((file, future))
+                continue
+            if file not in self.pdf_files:
+                continue  # removed while it was being previewed
+            self.previews[file] = future.exception() or future.result()
+            for index, f in enumerate(self.pdf_files):
+                if f == file:
+                    self.file_listbox.delete(index)
+                    self.file_listbox.insert(index, self.file_label(file))
+        self.preview_jobs = running
+        if running:
+            self.root.after(50, self.poll_previews)
+        else:
+            self.show_preview_summary()
+
+    def show_preview_summary(self):
+        previews = [self.previews.get(f) for f in self.pdf_files]
+        good = [p for p in previews if p is not None and not isinstance(p, Exception)]
+        if not good:
+            self.status_label.config(text="Nothing to preview")
+            return
+        total = sum(p.total or 0.0 for p in good)
+        exact = all(p.exact for p in good)
+        self.status_label.config(
+            text=f"Previewed {len(good)} check(s), {sum(p.pages or 0 for p in good)} page(s): "
+                 f"{'' if exact else '≈ '}${total:,.2f}"
+        )
+
+    def loose_file_count(self):
+        return sum(1 for f in self.pdf_files if split_member(f)[1] is None)
+
     def update_file_count(self):
         count = len(self.pdf_files)
-        self.file_count_label.config(text=f"Files: {count}/25")
+        loose = self.loose_file_count()
+        if loose == count:
+            self.file_count_label.config(text=f"Files: {count}/25")
+        else:
+            self.file_count_label.config(text=f"Files: {count} ({loose}/25 outside archives)")
 
     def get_safe_save_path(self):
         """Get a safe path where we can save the file"""
@@ -320,16 +531,17 @@ class PDFPageCounter:
         else:
             return save_dir
 
-    def generate_report(self):
+    def get_output_path(self):
+        """Full output path from the filename and save location fields, or None if one is missing"""
         if not self.pdf_files:
-            messagebox.showinfo("No Files", "Please select at least one PDF file.")
-            return
+            messagebox.showinfo("No Files", "Please select at least one file.")
+            return None
 
         # Get output filename
         output_filename = self.output_filename.get().strip()
         if not output_filename:
             messagebox.showwarning("Invalid Filename", "Please enter a valid output filename.")
-            return
+            return None
 
         # Ensure .xlsx extension
         if not output_filename.lower().endswith('.xlsx'):
@@ -339,76 +551,108 @@ class PDFPageCounter:
         save_dir = self.get_safe_save_path()
         if not save_dir:
             self.status_label.config(text="No valid save location selected")
-            return
+            return None
 
         # Create full path
-        output_path = os.path.join(save_dir, output_filename)
-
-        # Check if file exists and ask for confirmation
-        if os.path.exists(output_path):
+        return os.path.join(save_dir, output_filename)
+
+    def confirm_output(self, output_path, fingerprint=None):
+        """Ask before replacing an existing report; False if the user keeps it"""
+        output_filename, save_dir = os.path.basename(output_path), os.path.dirname(output_path)
+
+        # Same files and store list as the report already there: nothing to redo unless forced
+        if fingerprint and os.path.exists(output_path) and is_current(output_path, fingerprint):
+            if messagebox.askyesno(
+                "Report Is Current",
+                f"'{output_filename}' was already generated from these files and the current store list.\n\n"
+                f"Rebuild it anyway?"
+            ):
+                return True
+            self.status_label.config(text=f"Report is current: {output_path}")
+            return False
+
+        # Check if file exists (or another queued job writes it) and ask for confirmation
+        queued = any(job.output_path == output_path and not job.finished for job in self.jobs.jobs)
+        if os.path.exists(output_path) or queued:
             response = messagebox.askyesno(
                 "File Exists",
                 f"'{output_filename}' already exists in\n{save_dir}\n\nOverwrite?"
             )
             if not response:
                 self.status_label.config(text="Operation cancelled")
-                return
+                return False
+        return True
+
+    def input_fingerprint(self, files):
+        try:
+            return report_fingerprint(files)
+        except OSError as e:
+            # a missing or unreadable file shows up properly during extraction
+            print(f"Could not fingerprint inputs: {e}")
+            return None
+
+    def generate_report(self):
+        output_path = self.get_output_path()
+        if not output_path:
+            return
+        fingerprint = self.input_fingerprint(self.pdf_files)
+        if not self.confirm_output(output_path, fingerprint):
+            return
 
         # Update status
-        self.status_label.config(text="Processing PDF files...")
+        self.status_label.config(text="Processing files...")
         self.root.update()  # Update GUI to show status change
 
         try:
-            # Try to import required libraries
-            try:
-                import pandas as pd
-            except ImportError:
-                messagebox.showerror(
-                    "Missing Dependency",
-                    "Pandas is required. Please install it with:\n\n"
-                    "pip install pandas"
-                )
-                self.status_label.config(text="Pandas not installed")
-                return
-
             cct = CostcoTree(
                 dir_path="costco",
                 pdf_files=self.pdf_files,
                 output_path=output_path
             )
-            wb = Workbook()
-            wb.remove(wb.active)
-            for idx, pdf_path in enumerate(self.pdf_files):
-                df1, df2, tab_name = cct.get_table_from_pdf(pdf_path=pdf_path)
-                cct.draw(df1, df2, tab_name=tab_name, wb=wb)
+            self.prefetch_files(self.pdf_files)
+            prefetched = {path: future for (path, _), future in self.prefetched.items()}
+            results, schedule = extract_scheduled(self.pool, self.pdf_files, prefetched=prefetched)
+            print(f"Extraction: {schedule}")
+            results = enrich_results(cct, results)
+            done = [(p, r) for p, r in zip(self.pdf_files, results) if not isinstance(r, Exception)]
+            failed = [(p, r) for p, r in zip(self.pdf_files, results) if isinstance(r, Exception)]
+            if not done:
+                raise failed[0][1]
+            tables = [r for _, r in done]
+            self.last_tables = tables
 
             # Try to save the file
             try:
-                # df.to_excel(output_path, index=False)
+                self.status_label.config(text="Writing Excel report...")
+                self.root.update()
+                # fingerprint what was actually written: the files that made it in and the
+                # store directory they were resolved with (it may have changed since the check above)
+                properties = report_properties([p for p, _ in done], store_csv=cct.store_csv)
+                cct.write_report(tables, executor=self.pool, properties=properties)
+                self.archive_tables(done)
 
                 # Update status
-                self.status_label.config(text=f"Report saved to: {output_path}")
+                self.status_label.config(
+                    text=f"Report saved to: {output_path} ({schedule.efficiency:.0%} parallel efficiency)"
+                )
 
                 # Show success message with option to open the file
+                skipped = ""
+                if failed:
+                    skipped = "Skipped (not included in the report):\n" + "\n".join(
+                        f"  {display_name(p)}: {e}" for p, e in failed
+                    ) + "\n\n"
                 response = messagebox.askyesno(
                     "Success",
                     f"Excel report generated successfully!\n\n"
                     f"Saved to: {output_path}\n"
-                    f"Total PDFs: {len(self.pdf_files)}\n"
+                    f"Total PDFs: {len(done)} of {len(self.pdf_files)}\n\n"
+                    f"{skipped}"
                     f"Would you like to open the file?"
                 )
 
                 if response:
-                    # Open the file with default application
-                    try:
-                        if sys.platform == "win32":
-                            os.startfile(output_path)
-                        elif sys.platform == "darwin":  # macOS
-                            subprocess.run(["open", output_path])
-                        else:  # Linux
-                            subprocess.run(["xdg-open", output_path])
-                    except:
-                        pass
+                    self.open_output(output_path)
 
             except PermissionError:
                 self.status_label.config(text="Permission denied - try different location")
@@ -429,6 +673,133 @@ class PDFPageCounter:
             self.status_label.config(text="Error generating report")
             messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}")
 
+    def open_output(self, output_path):
+        # Open the file with default application
+        try:
+            if sys.platform == "win32":
+                os.startfile(output_path)
+            elif sys.platform == "darwin":  # macOS
+                subprocess.run(["open", output_path])
+            else:  # Linux
+                subprocess.run(["xdg-open", output_path])
+        except:
+            pass
+
+    def queue_job(self):
+        """Queue the current file list as a report job and clear the list for the next one"""
+        output_path = self.get_output_path()
+        if not output_path or not self.confirm_output(output_path, self.input_fingerprint(self.pdf_files)):
+            return
+        # the job takes over whatever has already been parsed in the background
+        prefetched = {path: self.prefetched.pop((path, mtime))
+                      for (path, mtime) in list(self.prefetched)
+                      if path in self.pdf_files and mtime == source_mtime(path)}
+        job = self.jobs.add(self.pdf_files, output_path, prefetched=prefetched)
+        self.pdf_files.clear()
+        self.previews.clear()
+        self.discard_prefetched()
+        self.file_listbox.delete(0, tk.END)
+        self.update_file_count()
+        self.status_label.config(text=f"Queued job {job.id}: {os.path.basename(output_path)}")
+        self.refresh_jobs()
+
+    def write_job(self, job, tables):
+        # runs on the job's own thread
+        cct = job.tree
+        cct.write_report(tables, executor=self.pool, properties=report_properties([p for p, _ in job.done], store_csv=cct.store_csv))
+        self.archive_tables(job.done)
+
+    def refresh_jobs(self):
+        for job in self.jobs.jobs:
+            iid = str(job.id)
+            values = (job.id, os.path.basename(job.output_path), len(job.files), job.progress(), f"{job.elapsed:.1f}s")
+            if self.jobs_tree.exists(iid):
+                self.jobs_tree.item(iid, values=values)
+            else:
+                self.jobs_tree.insert("", tk.END, iid=iid, values=values)
+            if job.finished and job.id not in self.reported_jobs:
+                self.reported_jobs.add(job.id)
+                if job.status.startswith("done"):
+                    self.last_tables = job.tables
+                    self.status_label.config(text=f"Job {job.id} saved to: {job.output_path}")
+                elif job.status == "failed":
+                    self.status_label.config(text=f"Job {job.id} failed: {str(job.error)[:60]}")
+        if any(not job.finished for job in self.jobs.jobs):
+            self.root.after(300, self.refresh_jobs)
+
+    def selected_job(self):
+        selection = self.jobs_tree.selection()
+        if not selection:
+            return None
+        return next((job for job in self.jobs.jobs if str(job.id) == selection[0]), None)
+
+    def cancel_job(self):
+        job = self.selected_job()
+        if job is not None and not job.finished:
+            self.jobs.cancel(job)
+            self.refresh_jobs()
+
+    def open_job(self):
+        job = self.selected_job()
+        if job is None:
+            return
+        if not job.status.startswith("done"):
+            if job.error is not None:
+                messagebox.showerror("Job Failed", f"{os.path.basename(job.output_path)}:\n{job.error}")
+            return
+        if job.failed:
+            messagebox.showinfo(
+                "Skipped Files",
+                "Not included in the report:\n" + "\n".join(f"  {display_name(p)}: {e}" for p, e in job.failed)
+            )
+        self.open_output(job.output_path)
+
+    def set_parallel_jobs(self):
+        try:
+            self.jobs.max_running = max(1, int(self.parallel_jobs.get()))
+        except (tk.TclError, ValueError):
+            return
+        self.jobs.start_next()
+
+    def archive_tables(self, done):
+        """Keep every processed check in the local archive (already-archived files are skipped)"""
+        try:
+            archive = Archive()
+            for pdf_path, (df1, df2, tab_name) in done:
+                archive.ingest(df1, df2, tab_name, source=pdf_path)
+        except Exception as e:
+            print(f"Could not archive line items: {e}")
+
+    def view_results(self):
+        """Line items and store totals of the last run, without opening the workbook"""
+        if not self.last_tables:
+            messagebox.showinfo("View Results", "Generate a report first.")
+            return
+        ResultViewer(self.root, self.last_tables, title=f"Results - {self.output_filename.get()}")
+
+    def store_lookup(self):
+        """Year-to-date totals for one store from the local archive"""
+        key = simpledialog.askstring("Store Lookup", "Store number (e.g. 0484):", parent=self.root)
+        if not key or not key.strip():
+            return
+
+        year = datetime.date.today().year
+        archive = Archive()
+        name, count, total = archive.store_total(key, year)
+        if not count:
+            messagebox.showinfo("Store Lookup", f"No archived payments for store #{key.strip()} in {year}.")
+            return
+
+        months = "\n".join(
+            f"{datetime.date(year, month, 1):%b}:  {amount:,.2f}"
+            for month, amount in archive.store_months(key, year)
+        )
+        messagebox.showinfo(
+            "Store Lookup",
+            f"{name} ({count} line items)\n\n"
+            f"{year} year to date: {total:,.2f}\n\n{months}"
+        )
+
     def save_to_temp_fallback(self, df, original_filename):
         """Save to temp directory as fallback"""
         try:
@@ -461,6 +832,8 @@ class PDFPageCounter:
 
 
 def main():
+    # COSTCO_TK_METRICS / COSTCO_TK_METRICS_PORT turn on the Prometheus metrics
+    metrics.enable_from_env(labels={"mode": "gui"})
     root = tk.Tk()
     app = PDFPageCounter(root)
 
@@ -476,20 +849,23 @@ def main():
 
 
 if __name__ == "__main__":
+    # worker processes re-enter this script in the frozen (pyinstaller) build
+    multiprocessing.freeze_support()
+
     # Check for required imports
     try:
-        import pandas as pd
+        import pdfplumber
     except ImportError:
-        print("Pandas is required. Install with: pip install pandas")
+        print("pdfplumber is required. Install with: pip install pdfplumber")
         print("Trying to install automatically...")
         try:
             import subprocess
             import sys
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "pandas", "openpyxl"])
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfplumber"])
             print("Installation successful. Please restart the application.")
         except:
             print("Failed to install automatically. Please run:")
-            print("pip install pandas openpyxl")
+            print("pip install pdfplumber")
         input("Press Enter to exit...")
         sys.exit(1)
 
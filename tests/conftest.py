@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+ROWS = [
+    ("0203629202", "01/10/2026", "183.54"),
+    ("0028894772", "01/10/2026", "552.25"),
+    ("0484371493", "01/10/2026", "671.13"),
+]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_home(tmp_path_factory):
+    # keep the raw store, profiles and store_numbers.csv override out of ~/.costco-tk;
+    # set before any pool is spawned so the workers inherit it
+    home = tmp_path_factory.mktemp("costco-tk")
+    os.environ["COSTCO_TK_HOME"] = str(home)
+    return home
+
+
+@pytest.fixture
+def export(tmp_path):
+    """Write a vendor-portal CSV export and return its path."""
+
+    def write(name="export.csv", rows=ROWS, payment="900100", delimiter=",", footer=None):
+        lines = ["Date: 01/10/2026", f"Payment #: {payment}",
+                 delimiter.join(("Invoice Number", "Invoice Date", "Amount"))]
+        lines += [delimiter.join(row) for row in rows]
+        if footer is not None:
+            lines.append(delimiter.join(footer))
+        path = tmp_path / name
+        path.write_text("\n".join(lines) + "\n")
+        return str(path)
+
+    return write
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages, size=(612, 792)) -> str:
+    """Minimal PDF: each page is a list of (x, y, text) and ("line", x0, y0, x1, y1) ops, Helvetica 10."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for ops in pages:
+        content = []
+        for op in ops:
+            if op[0] == "line":
+                content.append("%g %g m %g %g l S" % op[1:])
+            else:
+                content.append("BT /F1 10 Tf %g %g Td (%s) Tj ET" % (op[0], op[1], _pdf_escape(op[2])))
+        stream = "\n".join(content)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {size[0]} {size[1]}] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, body in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return str(path)
+
+
+COLUMNS = (72, 180, 400)  # invoice number, description, amount
+TABLE_RIGHT = 500
+
+
+def remittance_page(rows, payment="900100", grid=True, total=None, row_pitch=18, line_pitch=12):
+    """One remittance page; a row's cells may be lists of lines (a wrapped cell, top-aligned)."""
+    ops = [(72, 740, "ACME FOODS REMITTANCE ADVICE"), (72, 720, "Date: 01/10/2026"),
+           (72, 705, f"Payment #: {payment}")]
+    top = 680
+    edges = [top]
+    for row in [("Invoice Number", "Description", "Amount")] + list(rows):
+        cells = [cell if isinstance(cell, (list, tuple)) else [cell] for cell in row]
+        height = row_pitch + line_pitch * (max(len(c) for c in cells) - 1)
+        for x, cell in zip(COLUMNS, cells):
+            for j, text in enumerate(cell):
+                if text:
+                    ops.append((x, top - 13 - j * line_pitch, text))
+        top -= height
+        edges.append(top)
+    if grid:
+        ops += [("line", COLUMNS[0] - 4, y, TABLE_RIGHT, y) for y in edges]
+        ops += [("line", x, edges[0], x, edges[-1]) for x in [c - 4 for c in COLUMNS] + [TABLE_RIGHT]]
+    if total is not None:
+        ops.append((300, top - 20, f"Total {total}"))
+    return ops
+
+
+@pytest.fixture
+def remittance_pdf(tmp_path):
+    """Write a remittance PDF (one page per list of rows) and return its path."""
+
+    def write(name="remittance.pdf", *pages, **kwargs):
+        return write_pdf(tmp_path / name, [remittance_page(rows, **kwargs) for rows in pages])
+
+    return write
@@ -0,0 +1,37 @@
+import sqlite3
+from types import SimpleNamespace
+
+from utils.archive import Archive
+
+TAB = ("01-10", "900100")
+
+
+def check(amounts):
+    items = [SimpleNamespace(invoice_number=f"02031000{i:02d}", amount=a, store_key="0484", store_name="Bakery")
+             for i, a in enumerate(amounts)]
+    return (SimpleNamespace(items=items, check_date="2026-01-10"),
+            SimpleNamespace(names=["Bakery"], amounts=[sum(amounts)]), TAB)
+
+
+def test_redownloaded_check_replaces_the_old_copy(tmp_path):
+    archive = Archive(str(tmp_path / "archive.sqlite3"))
+    assert archive.ingest(*check([10.0, 20.0]), source="a.pdf", digest="hash-a")
+    assert not archive.ingest(*check([10.0, 20.0]), source="a.pdf", digest="hash-a")
+    assert archive.ingest(*check([10.0, 20.0]), source="a (1).pdf", digest="hash-b")
+
+    assert archive.store_total("484", 2026) == ("Bakery", 2, 30.0)
+    checks, summary = archive.payment("900100")
+    assert [source for _, _, source in checks] == ["a (1).pdf"]
+    assert summary == [("Bakery", 30.0)]
+
+
+def test_opening_drops_duplicates_stored_earlier(tmp_path):
+    path = str(tmp_path / "archive.sqlite3")
+    archive = Archive(path)
+    archive.ingest(*check([10.0]), source="a.pdf", digest="hash-a")
+    # what the old ingest left behind for a re-downloaded file
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO checks VALUES ('900100', 'hash-b', 'a (1).pdf', '2026-01-10', 2026, 10.0, '')")
+        conn.execute("INSERT INTO line_items VALUES ('900100', 'hash-b', '0203100000', 10.0, '0484', 'Bakery',"
+                     " '2026-01-10', 2026)")
+    assert Archive(path).store_total("0484", 2026) == ("Bakery", 1, 10.0)
@@ -0,0 +1,35 @@
+from utils.fingerprint import is_current, report_fingerprint, report_properties
+from utils.paths import app_file
+from utils.pool import WarmPool
+from utils.schedule import enrich_results, extract_scheduled, prefetch
+from utils.tree import STORE_NUMBERS_FILE, CostcoTree
+
+
+def test_store_directory_edit_reaches_prefetched_results(export, tmp_path, monkeypatch):
+    # a home of its own, so the store_numbers.csv override doesn't outlive the test;
+    # set before the pool spawns so its worker sees the same home
+    monkeypatch.setenv("COSTCO_TK_HOME", str(tmp_path / "home"))
+    path = export()
+    override = app_file(STORE_NUMBERS_FILE)
+    with open(override, "w") as f:
+        f.write("Old Name,COSTCO,#0203\n")
+    pool = WarmPool(max_workers=1)
+    try:
+        futures = prefetch(pool, [path])
+        futures[path].result(timeout=60)
+        with open(override, "w") as f:
+            f.write("New Name,COSTCO,#0203\n")
+
+        results, _ = extract_scheduled(pool, [path], prefetched=futures)
+        cct = CostcoTree(dir_path="costco", pdf_files=[path], output_path=str(tmp_path / "out.xlsx"))
+        (df1, df2, tab_name), = enrich_results(cct, results)
+    finally:
+        pool.shutdown()
+
+    assert df1.items[0].store_name == "New Name"
+    cct.write_report([(df1, df2, tab_name)], properties=report_properties([path], store_csv=cct.store_csv))
+    assert is_current(cct.output_path, report_fingerprint([path]))
+
+    with open(override, "w") as f:
+        f.write("Newer Name,COSTCO,#0203\n")
+    assert not is_current(cct.output_path, report_fingerprint([path]))
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import Future
+
+from utils.jobs import JobQueue
+
+
+class PendingPool(object):
+    """Accepts every file and never finishes it, so jobs stay busy until cancelled."""
+
+    max_workers = 1
+    max_pages = 0
+
+    def __init__(self) -> None:
+        self.futures = []
+
+    def submit_file(self, path, timeout=None, max_pages=None):
+        self.futures.append(Future())
+        return self.futures[-1]
+
+    def drain(self) -> None:
+        # what WarmPool's supervisor does with a cancelled task once it reaches it
+        for future in self.futures:
+            future.set_running_or_notify_cancel()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_cancel_queued_job_cancels_prefetched_futures(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4\n")
+    pool = PendingPool()
+    jobs = JobQueue(pool, write=lambda job, tables: None)
+    running = jobs.add([str(tmp_path / "a.pdf")], str(tmp_path / "a.xlsx"))
+    prefetched = {"b.pdf": Future()}
+    queued = jobs.add(["b.pdf"], "b.xlsx", prefetched=prefetched)
+    assert queued.status == "queued"
+
+    jobs.cancel(queued)
+    assert queued.status == "cancelled"
+    assert prefetched["b.pdf"].cancelled()
+
+    wait_for(lambda: running.futures)
+    jobs.cancel(running)
+    pool.drain()
+    wait_for(lambda: running.status == "cancelled")
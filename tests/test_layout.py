@@ -0,0 +1,33 @@
+import pdfplumber
+
+from conftest import write_pdf
+from utils.layout import LayoutCache, layout_fingerprint
+
+TEXT_SETTINGS = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+
+
+def remittance(path, rows):
+    # no ruling lines, so pdfplumber has to find the table from the text alone
+    ops = [(72, 740, "ACME FOODS REMITTANCE ADVICE"), (72, 720, "Date: 01/10/2026")]
+    y = 680
+    for row in [("Invoice Number", "Invoice Date", "Amount")] + rows:
+        ops += [(x, y, text) for x, text in zip((72, 220, 380), row)]
+        y -= 24
+    return write_pdf(path, [ops])
+
+
+def extract(cache, path):
+    with pdfplumber.open(path) as pdf:
+        page = pdf.pages[0]
+        key = layout_fingerprint(page, "ACME FOODS REMITTANCE ADVICE", continuation=False)
+        return cache.extract_table(page, key, TEXT_SETTINGS)
+
+
+def test_text_table_longer_than_template_is_not_cut(tmp_path):
+    rows = [(f"0203{100000 + i}", "01/10/2026", f"{100 + i}.25") for i in range(20)]
+    cache = LayoutCache()
+    extract(cache, remittance(tmp_path / "short.pdf", rows[:5]))
+
+    table = extract(cache, remittance(tmp_path / "long.pdf", rows))
+    invoices = {row[0] for row in table}
+    assert all(row[0] in invoices for row in rows)
@@ -0,0 +1,29 @@
+import pytest
+
+from utils import metrics
+from utils.pool import WarmPool
+
+
+@pytest.fixture
+def registry():
+    metrics.enable()
+    yield metrics.REGISTRY
+    metrics.REGISTRY = None
+
+
+def test_worker_counts_reach_the_parent(registry, export):
+    pool = WarmPool(max_workers=1)
+    try:
+        raw = pool.submit_file(export()).result(timeout=60)
+    finally:
+        pool.shutdown()
+    assert len(raw.rows) == 3
+    assert "costco_rows_total 3\n" in registry.render()
+
+
+def test_merge_adds_histograms(registry):
+    metrics.observe("stage_seconds", 0.2, stage="parse")
+    delta = metrics.take()
+    metrics.merge(delta)
+    metrics.merge(delta)
+    assert 'costco_stage_seconds_count{stage="parse"} 2\n' in registry.render()
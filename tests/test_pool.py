@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from utils.pool import FileTimeout, WarmPool
+
+
+def raise_file_timeout():
+    # FileTimeout pickles by its message only, so it can't be rebuilt in the parent
+    raise FileTimeout("x.pdf", 1, 2, 3)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WarmPool(max_workers=1)
+    assert pool.warm(timeout=60)
+    yield pool
+    pool.shutdown()
+
+
+def test_unpicklable_task_fails_only_its_future(pool):
+    bad = pool.submit(lambda: 1)
+    with pytest.raises(RuntimeError):
+        bad.result(timeout=30)
+    assert pool.submit(pow, 2, 5).result(timeout=30) == 32
+    assert pool._thread.is_alive()
+
+
+def test_unpicklable_exception_fails_only_its_future(pool):
+    bad = pool.submit(raise_file_timeout)
+    with pytest.raises(RuntimeError):
+        bad.result(timeout=30)
+    assert pool.submit(pow, 3, 2).result(timeout=30) == 9
+    assert pool._thread.is_alive()
+
+
+def test_urgent_task_timeout_frees_the_worker(pool):
+    slow = pool.submit_next(time.sleep, 60, timeout=1, label="slow.pdf")
+    with pytest.raises(FileTimeout):
+        slow.result(timeout=30)
+    assert pool.submit(pow, 2, 3).result(timeout=60) == 8
@@ -0,0 +1,16 @@
+from utils.preview import preview_file
+
+ROWS = [("0203100001", "Frozen", "10.00"), ("0203100002", "Dry", "20.00")]
+
+
+def test_printed_total_is_exact(remittance_pdf):
+    preview = preview_file(remittance_pdf("total.pdf", ROWS, total="30.00"))
+    assert (preview.payment, preview.pages, preview.total, preview.exact) == ("900100", 1, 30.0, True)
+
+
+def test_rows_without_a_total_are_an_estimate(remittance_pdf):
+    # the table may be cut short, so one page of rows alone doesn't make the total exact
+    for path in (remittance_pdf("one.pdf", ROWS), remittance_pdf("two.pdf", ROWS, ROWS)):
+        preview = preview_file(path)
+        assert preview.total and not preview.exact
+        assert str(preview).endswith("≈ $%.2f" % preview.total)
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import remittance_page, write_pdf
+from utils.tree import CostcoTree
+
+ROWS = [
+    ("0203100001", ["Frozen goods", "and more"], "10.00"),
+    ("0203100002", "Dry", "20.00"),
+    ("0028100003", ["Dairy", "chilled", "returns"], "30.00"),
+    ("0484100004", ["Bakery", "bread"], "40.00"),
+]
+
+
+@pytest.fixture
+def tree():
+    return CostcoTree(dir_path="costco", pdf_files=[], output_path="")
+
+
+def rows(tree, path, engine):
+    return tree.extract_raw(path, persist=False, engine=engine, fallback=False).rows
+
+
+@pytest.mark.parametrize("total", [None, "100.00"])
+def test_wrapped_cells_match_pdfplumber(tree, remittance_pdf, total):
+    path = remittance_pdf("wrapped.pdf", ROWS, total=total)
+    table = rows(tree, path, "pypdf")
+    assert table == rows(tree, path, "pdfplumber")
+    assert len(table) == 4
+    assert table[2][1] == "Dairy\nchilled\nreturns"
+
+
+def test_rows_across_pages(tree, remittance_pdf):
+    path = remittance_pdf("pages.pdf", ROWS[:2], ROWS[2:])
+    assert rows(tree, path, "pypdf") == rows(tree, path, "pdfplumber")
+
+
+def test_interrupted_table_is_rejected(tree, tmp_path):
+    page = remittance_page(ROWS[1:3])
+    page.append((20, 640, "see attached"))  # between the first two rows, left of the table
+    path = write_pdf(tmp_path / "interrupted.pdf", [page])
+    with pytest.raises(ValueError, match="invoice row after the end of the table"):
+        rows(tree, path, "pypdf")
+
+
+def test_total_mismatch_falls_back(tree, remittance_pdf):
+    path = remittance_pdf("short.pdf", ROWS, total="150.00")
+    raw = tree.extract_raw(path, persist=False, engine="pypdf")
+    assert tree.engine_stats["fallbacks"] == 1
+    assert raw.rows == rows(tree, path, "pdfplumber")
@@ -0,0 +1,54 @@
+from concurrent.futures import Future
+
+from utils.schedule import extract_scheduled, prefetch
+
+
+class FakePool(object):
+    """Resolves every file at once to its name, or to an error for the files in `failing`."""
+
+    max_workers = 1
+    max_pages = 0
+
+    def __init__(self, failing=()) -> None:
+        self.failing = set(failing)
+        self.submitted = []
+
+    def submit_file(self, path, timeout=None, max_pages=None):
+        self.submitted.append(path)
+        future = Future()
+        if path in self.failing:
+            future.set_exception(OSError(f"{path} is locked"))
+        else:
+            future.set_result(path)
+        return future
+
+
+def test_failed_prefetch_is_submitted_again():
+    pool = FakePool(failing=["b.pdf"])
+    prefetched = prefetch(pool, ["a.pdf", "b.pdf"])
+    pool.failing.clear()
+
+    results, _ = extract_scheduled(pool, ["a.pdf", "b.pdf"], prefetched=prefetched)
+    assert results == ["a.pdf", "b.pdf"]
+    assert sorted(pool.submitted) == ["a.pdf", "b.pdf", "b.pdf"]
+
+
+def test_failures_of_this_run_are_kept():
+    pool = FakePool(failing=["b.pdf"])
+    futures = prefetch(pool, ["a.pdf", "b.pdf"])
+
+    results, _ = extract_scheduled(pool, ["a.pdf", "b.pdf"], prefetched=futures, retry_failed=False)
+    assert results[0] == "a.pdf" and isinstance(results[1], OSError)
+    assert len(pool.submitted) == 2
+
+
+def test_efficiency_counts_only_this_run():
+    pool = FakePool()
+    prefetched = prefetch(pool, ["a.pdf"])
+    # parsed in the background a while before Generate
+    future = prefetched["a.pdf"]
+    future.submitted, future.finished, future.elapsed = future.submitted - 100, future.finished - 90, 10.0
+
+    _, report = extract_scheduled(pool, ["a.pdf", "b.pdf"], prefetched=prefetched)
+    assert report.wall < 5
+    assert report.busy == 0.0
@@ -0,0 +1,28 @@
+import pytest
+
+from utils.structured import read_remittance
+
+
+def test_reads_export(export):
+    raw = read_remittance(export())
+    assert raw.tab_name == ["01-10", "900100"]
+    assert raw.check_date == "2026-01-10"
+    assert [row[0] for row in raw.rows] == ["0203629202", "0028894772", "0484371493"]
+
+
+@pytest.mark.parametrize("footer", [
+    ("", "", "1407.92"),
+    ("Total", "", "1407.92"),
+    ("", "Total", "1407.92"),
+    ("TOTAL PAID", "", "1407.92"),
+])
+def test_total_row_ends_the_detail(export, footer):
+    raw = read_remittance(export(footer=footer))
+    assert len(raw.rows) == 3
+
+
+@pytest.mark.parametrize("delimiter", [";", "\t", "|"])
+def test_delimiter_with_preamble(export, delimiter):
+    raw = read_remittance(export(delimiter=delimiter, footer=("Total", "", "1407,92")))
+    assert raw.columns[0] == "invoiceNumber" and raw.columns[-1] == "amount"
+    assert len(raw.rows) == 3
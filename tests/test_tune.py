@@ -0,0 +1,22 @@
+from utils.tree import CostcoTree
+from utils.tune import compare_engines
+
+
+def fake_extract_raw(pages_read):
+    def extract_raw(self, path, persist=True, engine=None, fallback=True, on_page=None):
+        self._pages_read = pages_read[engine]
+        raise ValueError(f"{engine} engine: no text layer")
+
+    return extract_raw
+
+
+def test_pages_come_from_pdfplumber(monkeypatch):
+    monkeypatch.setattr(CostcoTree, "extract_raw", fake_extract_raw({"pdfplumber": 4, "pypdf": 1}))
+    monkeypatch.setattr("utils.tune.time.perf_counter", iter(range(100)).__next__)
+    pypdf_ms, plumber_ms, identical = compare_engines(["a.pdf"], repeat=1, log=lambda *a: None)
+    assert (pypdf_ms, plumber_ms, identical) == (250.0, 250.0, False)
+
+
+def test_nothing_read(monkeypatch):
+    monkeypatch.setattr(CostcoTree, "extract_raw", fake_extract_raw({"pdfplumber": 0, "pypdf": 0}))
+    assert compare_engines(["a.pdf"], repeat=1, log=lambda *a: None) == (0.0, 0.0, False)
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+from openpyxl import load_workbook
+
+from utils import work_queue
+from utils.work_queue import WorkQueue, merge, work
+
+AN_HOUR_AGO = time.time() - 3600
+
+
+def exports(export, n):
+    return [export(f"export_{i}.csv", payment=str(900100 + i)) for i in range(n)]
+
+
+def test_processes_share_the_queue(export, tmp_path):
+    path = str(tmp_path / "q")
+    assert WorkQueue(path).enqueue(exports(export, 6)) == 6
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=work, args=(path, 30)) for _ in range(3)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(120)
+        assert proc.exitcode == 0
+
+    counts = WorkQueue(path).counts()
+    assert counts["done"] == 6 and counts["results"] == 6
+    assert counts["todo"] == counts["claimed"] == counts["failed"] == 0
+    out = str(tmp_path / "merged.xlsx")
+    merge(path, out)
+    assert len(load_workbook(out).sheetnames) == 6
+
+
+def test_abandoned_claim_is_recovered(export, tmp_path):
+    path = str(tmp_path / "q")
+    queue = WorkQueue(path, lease=30)
+    queue.enqueue(exports(export, 2))
+    task = queue.claim("crashed-worker")
+    os.utime(queue._file("claimed", task["id"]), (AN_HOUR_AGO, AN_HOUR_AGO))
+
+    assert work(path, lease=30) == 2
+    counts = queue.counts()
+    assert counts["done"] == 2 and counts["claimed"] == 0
+
+
+def test_fresh_claim_survives_recover(export, tmp_path, monkeypatch):
+    path = str(tmp_path / "q")
+    queue, other = WorkQueue(path, lease=30), WorkQueue(path, lease=30)
+    queue.enqueue(exports(export, 1))
+    tid = queue._ids("todo")[0]
+    # queued long ago: the rename must not carry that age into claimed/
+    os.utime(queue._file("todo", tid), (AN_HOUR_AGO, AN_HOUR_AGO))
+
+    rename, recovering = os.rename, []
+
+    def rename_then_recover(src, dst):
+        rename(src, dst)
+        if not recovering:
+            recovering.append(dst)
+            other.recover()  # another worker that found todo/ empty
+
+    monkeypatch.setattr(work_queue.os, "rename", rename_then_recover)
+    task = queue.claim("worker")
+    monkeypatch.undo()
+
+    assert task is not None and task["id"] == tid
+    assert queue.counts()["claimed"] == 1
+
+
+def test_hung_file_fails_within_its_budget(tmp_path):
+    path = str(tmp_path / "q")
+    queue = WorkQueue(path, lease=30)
+    hung = str(tmp_path / "hung.pdf")
+    os.mkfifo(hung)  # opening it for reading blocks until a writer shows up, i.e. forever
+    queue.enqueue([hung])
+
+    start = time.monotonic()
+    assert work(path, lease=30, timeout=2) == 1
+    assert time.monotonic() - start < 60
+    counts = queue.counts()
+    assert counts["failed"] == 1 and counts["claimed"] == 0
+    assert "FileTimeout" in work_queue._read_json(queue._file("failed", queue._ids("failed")[0]))["error"]
+
+
+def test_page_budget_applies(remittance_pdf, tmp_path):
+    path = str(tmp_path / "q")
+    queue = WorkQueue(path)
+    rows = [("0203100001", "Frozen", "10.00")]
+    queue.enqueue([remittance_pdf("long.pdf", rows, rows)])
+
+    assert work(path, max_pages=1) == 1
+    assert queue.counts()["failed"] == 1
+
+
+def test_merge_refuses_missing_tasks(export, tmp_path):
+    path = str(tmp_path / "q")
+    queue = WorkQueue(path)
+    queue.enqueue(exports(export, 2))
+    task = queue.claim("worker")
+    queue.finish(task, raw=None, error="boom")
+    out = str(tmp_path / "merged.xlsx")
+
+    with pytest.raises(ValueError, match="2 task"):
+        merge(path, out)
+    assert not os.path.exists(out)
+
+    work(path)
+    with pytest.raises(ValueError, match="failed"):
+        merge(path, out)
+    assert merge(path, out, partial=True) == [out]
+    assert len(load_workbook(out).sheetnames) == 1
@@ -0,0 +1,24 @@
+from openpyxl import load_workbook
+
+from utils.xlsx_writer import read_custom_properties, render_workbook, unique_sheet_names
+
+ROWS = [["invoiceNumber", "amount"], ["0203100001", 10.5], [], ["Total", 10.5]]
+
+
+def test_titles_openpyxl_accepts(tmp_path):
+    names = ["01-10 #CHK/2026:001", "01-10 #chk/2026:001", "[draft] a*b?c\\d", "'quoted'",
+             "01-10 #" + "9" * 40, "01-10 #" + "9" * 40]
+    path = str(tmp_path / "report.xlsx")
+    render_workbook([(name, ROWS) for name in names], path, properties={"CostcoReportFingerprint": "abc"})
+
+    wb = load_workbook(path)
+    assert wb.sheetnames == unique_sheet_names(names)
+    assert len({name.lower() for name in wb.sheetnames}) == len(names)
+    assert all(len(name) <= 31 for name in wb.sheetnames)
+    assert [list(r) for r in wb.worksheets[0].iter_rows(min_row=1, max_row=2, values_only=True)] == ROWS[:2]
+    assert read_custom_properties(path) == {"CostcoReportFingerprint": "abc"}
+
+
+def test_unique_names():
+    assert unique_sheet_names(["x", "X", "x"]) == ["x", "X1", "x2"]
+    assert unique_sheet_names(["a/b", "a:b"]) == ["a_b", "a_b1"]
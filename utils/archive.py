@@ -0,0 +1,229 @@
+"""Local SQLite archive of every processed check, for cross-month store queries.
+
+    python -m utils.archive store 0484 --year 2026
+    python -m utils.archive payment 900100
+    python -m utils.archive ytd --year 2026
+    python -m utils.archive ingest remittance1.pdf remittance2.pdf
+"""
+import argparse
+import contextlib
+import datetime
+import sqlite3
+from collections import defaultdict
+
+from utils.paths import app_file
+from utils.sources import expand_inputs, source_hash
+
+ARCHIVE_FILE = "archive.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    payment_number TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    source TEXT,
+    check_date TEXT,
+    year INTEGER,
+    total REAL,
+    ingested_at TEXT,
+    PRIMARY KEY (payment_number, file_hash)
+);
+CREATE TABLE IF NOT EXISTS line_items (
+    payment_number TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    invoice_number TEXT,
+    amount REAL,
+    store_key TEXT,
+    store_name TEXT,
+    check_date TEXT,
+    year INTEGER
+);
+CREATE TABLE IF NOT EXISTS summary (
+    payment_number TEXT NOT NULL,
+    file_hash TEXT NOT NULL,
+    store_name TEXT,
+    amount REAL
+);
+CREATE INDEX IF NOT EXISTS ix_items_store ON line_items (store_key, year);
+CREATE INDEX IF NOT EXISTS ix_items_payment ON line_items (payment_number, file_hash);
+CREATE INDEX IF NOT EXISTS ix_items_date ON line_items (year, check_date);
+CREATE INDEX IF NOT EXISTS ix_summary_payment ON summary (payment_number, file_hash);
+CREATE INDEX IF NOT EXISTS ix_checks_date ON checks (year, check_date);
+"""
+
+# archives written before a re-downloaded file replaced its check can hold one
+# payment under several hashes; keep only the copy ingested last
+DROP_SUPERSEDED = """
+DELETE FROM checks WHERE rowid NOT IN (SELECT MAX(rowid) FROM checks GROUP BY payment_number);
+DELETE FROM line_items WHERE (payment_number, file_hash) NOT IN (SELECT payment_number, file_hash FROM checks);
+DELETE FROM summary WHERE (payment_number, file_hash) NOT IN (SELECT payment_number, file_hash FROM checks);
+"""
+
+
+def infer_check_date(mm_dd: str, today=None) -> str:
+    """ISO date for an "mm-dd" sheet date, assuming the most recent such day."""
+    today = today or datetime.date.today()
+    month, day = (int(x) for x in mm_dd.split("-"))
+    year = today.year if (month, day) <= (today.month, today.day) else today.year - 1
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def normalize_store_key(key: str) -> str:
+    return str(key).strip().lstrip("#").zfill(4)
+
+
+class Archive(object):
+    def __init__(self, path: str = None) -> None:
+        self.path = path or app_file(ARCHIVE_FILE)
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("SELECT 1 FROM checks GROUP BY payment_number HAVING COUNT(*) > 1 LIMIT 1").fetchone():
+                conn.executescript(DROP_SUPERSEDED)
+
+    @contextlib.contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def ingest(self, df, df2, tab_name, source: str, digest: str = None,
+               check_date: str = None, replace: bool = False) -> bool:
+        """Store one check's detail and summary rows. Returns False if it was already archived.
+
+        A payment number is archived once: a file with the same number but other
+        content (a re-downloaded PDF) replaces the rows stored for it before.
+        """
+        payment_number = tab_name[1]
+        digest = digest or source_hash(source)
+        check_date = check_date or getattr(df, "check_date", None) or infer_check_date(tab_name[0])
+        year = int(check_date[:4])
+
+        items = [
+            (payment_number, digest, item.invoice_number, item.amount, item.store_key,
+             item.store_name, check_date, year)
+            for item in df.items
+        ]
+        summary = [
+            (payment_number, digest, name, amount)
+            for name, amount in zip(df2.names, df2.amounts)
+        ]
+        total = sum(row[-1] for row in summary)
+
+        with self.connect() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM checks WHERE payment_number = ? AND file_hash = ?",
+                (payment_number, digest),
+            ).fetchone()
+            if exists and not replace:
+                return False
+            for table in ("checks", "line_items", "summary"):
+                conn.execute(f"DELETE FROM {table} WHERE payment_number = ?", (payment_number,))
+            conn.execute(
+                "INSERT INTO checks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (payment_number, digest, source, check_date, year, total,
+                 datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.executemany("INSERT INTO line_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)", items)
+            conn.executemany("INSERT INTO summary VALUES (?, ?, ?, ?)", summary)
+        return True
+
+    def store_total(self, store_key: str, year: int = None):
+        """(store name, line count, total) for one store, optionally limited to a year."""
+        sql = "SELECT store_name, COUNT(*), COALESCE(SUM(amount), 0) FROM line_items WHERE store_key = ?"
+        args = [normalize_store_key(store_key)]
+        if year:
+            sql += " AND year = ?"
+            args.append(year)
+        with self.connect() as conn:
+            name, count, total = conn.execute(sql, args).fetchone()
+        return name, count, total
+
+    def store_months(self, store_key: str, year: int):
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT substr(check_date, 6, 2), SUM(amount) FROM line_items"
+                " WHERE store_key = ? AND year = ? GROUP BY 1 ORDER BY 1",
+                (normalize_store_key(store_key), year),
+            ).fetchall()
+        return [(int(m), total) for m, total in rows]
+
+    def payment(self, payment_number: str):
+        with self.connect() as conn:
+            checks = conn.execute(
+                "SELECT check_date, total, source FROM checks WHERE payment_number = ?",
+                (payment_number,),
+            ).fetchall()
+            summary = conn.execute(
+                "SELECT store_name, SUM(amount) FROM summary WHERE payment_number = ?"
+                " GROUP BY store_name ORDER BY store_name",
+                (payment_number,),
+            ).fetchall()
+        return checks, summary
+
+    def ytd_pivot(self, year: int):
+        """{(store key, store name): {month: total}} for every store paid in `year`."""
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT store_key, store_name, substr(check_date, 6, 2), SUM(amount)"
+                " FROM line_items WHERE year = ? GROUP BY 1, 2, 3",
+                (year,),
+            ).fetchall()
+        pivot = defaultdict(dict)
+        for key, name, month, total in rows:
+            pivot[(key, name)][int(month)] = total
+        return dict(sorted(pivot.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the local line-item archive.")
+    parser.add_argument("--db", help=f"archive path (default: {app_file(ARCHIVE_FILE)})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("store", help="totals for one store")
+    p.add_argument("key")
+    p.add_argument("--year", type=int, default=datetime.date.today().year)
+    p = sub.add_parser("payment", help="stores paid by one check")
+    p.add_argument("number")
+    p = sub.add_parser("ytd", help="store x month pivot for a year")
+    p.add_argument("--year", type=int, default=datetime.date.today().year)
+    p = sub.add_parser("ingest", help="parse PDFs and archive them")
+    p.add_argument("pdfs", nargs="+")
+    p.add_argument("--replace", action="store_true", help="re-archive checks already stored")
+    args = parser.parse_args(argv)
+
+    archive = Archive(args.db)
+    if args.cmd == "store":
+        name, count, total = archive.store_total(args.key, args.year)
+        print(f"#{normalize_store_key(args.key)} {name or '(not archived)'}: {count} line(s), {total:,.2f} in {args.year}")
+        for month, amount in archive.store_months(args.key, args.year):
+            print(f"  {datetime.date(args.year, month, 1):%b}  {amount:>12,.2f}")
+    elif args.cmd == "payment":
+        checks, summary = archive.payment(args.number)
+        if not checks:
+            print(f"payment #{args.number} is not archived")
+        for check_date, total, source in checks:
+            print(f"{check_date}  {total:,.2f}  {source}")
+        for name, amount in summary:
+            print(f"  {name:<10} {amount:>12,.2f}")
+    elif args.cmd == "ytd":
+        pivot = archive.ytd_pivot(args.year)
+        months = sorted({m for totals in pivot.values() for m in totals})
+        print("store".ljust(14) + "".join(f"{datetime.date(args.year, m, 1):%b}".rjust(12) for m in months) + "total".rjust(14))
+        for (key, name), totals in pivot.items():
+            cells = "".join(f"{totals.get(m, 0):>12,.2f}" for m in months)
+            print(f"{key} {name:<9}" + cells + f"{sum(totals.values()):>14,.2f}")
+    elif args.cmd == "ingest":
+        from utils.tree import CostcoTree
+
+        pdfs = expand_inputs(args.pdfs)
+        cct = CostcoTree(dir_path="costco", pdf_files=pdfs, output_path="")
+        for pdf_path in pdfs:
+            df, df2, tab_name = cct.get_table_from_pdf(pdf_path=pdf_path)
+            added = archive.ingest(df, df2, tab_name, source=pdf_path, replace=args.replace)
+            print(f"{'archived' if added else 'already archived'}: {pdf_path} (#{tab_name[1]})")
+
+
+if __name__ == "__main__":
+    main()
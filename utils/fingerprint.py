@@ -0,0 +1,36 @@
+import hashlib
+import json
+
+from utils.sources import source_hash
+from utils.xlsx_writer import read_custom_properties
+
+# A report is fully determined by its input files (in sheet order), the store
+# directory used to name stores and the output options. Their digest is stored
+# in the workbook, so a later Generate with the same inputs can tell the file
+# on disk is already current and skip the parse and write.
+
+FINGERPRINT_PROPERTY = "CostcoReportFingerprint"
+REPORT_FORMAT = 1  # bump when the sheet layout changes, so older reports get rebuilt
+
+
+def report_fingerprint(paths, options: dict = None, store_csv: str = None) -> str:
+    """`store_csv` is the store directory the report was resolved with (default: the current one)."""
+    if store_csv is None:
+        from utils.tree import store_directory_csv
+
+        store_csv = store_directory_csv()
+    h = hashlib.sha256()
+    h.update(json.dumps({"format": REPORT_FORMAT, "options": options or {}}, sort_keys=True).encode("utf-8"))
+    for path in paths:
+        h.update(b"\0" + source_hash(path).encode("ascii"))
+    h.update(b"\0" + hashlib.sha256(store_csv.encode("utf-8")).digest())
+    return h.hexdigest()
+
+
+def report_properties(paths, options: dict = None, store_csv: str = None) -> dict:
+    return {FINGERPRINT_PROPERTY: report_fingerprint(paths, options, store_csv)}
+
+
+def is_current(output_path: str, fingerprint: str) -> bool:
+    """True if the workbook at output_path was written from exactly these inputs."""
+    return read_custom_properties(output_path).get(FINGERPRINT_PROPERTY) == fingerprint
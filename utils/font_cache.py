@@ -0,0 +1,156 @@
+"""Process-wide cache of decoded pdfminer fonts, shared by every PDF a process opens.
+
+    python -m utils.font_cache remittance1.pdf remittance2.pdf ...
+
+pdfminer builds its font objects (widths, encodings, ToUnicode CMaps, embedded
+font programs) per document, keyed by object id. Our remittances all embed the
+same fonts, so here they are keyed by a digest of the resolved font dictionary
+and its streams instead and reused by later documents in the same process.
+"""
+import argparse
+import hashlib
+import time
+from collections import OrderedDict
+
+from pdfminer.pdfinterp import PDFResourceManager
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from pdfminer.psparser import PSLiteral
+
+MAX_FONTS = 32  # a cached font keeps its source document alive, so keep this small
+MAX_DEPTH = 8
+
+
+class FontCache(object):
+    """Bounded LRU of font objects by spec digest, with hit/miss counts."""
+
+    def __init__(self, maxsize: int = MAX_FONTS) -> None:
+        self.maxsize = maxsize
+        self.fonts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        font = self.fonts.get(key)
+        if font is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.fonts.move_to_end(key)
+        return font
+
+    def put(self, key, font) -> None:
+        self.fonts[key] = font
+        self.fonts.move_to_end(key)
+        while len(self.fonts) > self.maxsize:
+            self.fonts.popitem(last=False)
+
+    def clear(self) -> None:
+        self.fonts.clear()
+        self.hits = self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"font cache {self.hit_rate:.0%} hits ({self.hits}/{self.hits + self.misses}), "
+                f"{len(self.fonts)} font(s) kept")
+
+
+FONTS = FontCache()
+
+
+def _feed(h, obj, depth: int) -> None:
+    if depth > MAX_DEPTH:
+        h.update(b"~")
+        return
+    if isinstance(obj, PDFObjRef):
+        # object ids differ between documents, the content they point at doesn't
+        try:
+            obj = obj.resolve()
+        except Exception:
+            h.update(b"?")
+            return
+    if isinstance(obj, PDFStream):
+        h.update(b"S")
+        _feed(h, obj.attrs, depth + 1)
+        h.update(hashlib.sha1(obj.get_data()).digest())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=str):
+            if k == "Parent":
+                continue
+            h.update(str(k).encode("utf-8", "replace") + b"=")
+            _feed(h, obj[k], depth + 1)
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for v in obj:
+            _feed(h, v, depth + 1)
+        h.update(b"]")
+    elif isinstance(obj, PSLiteral):
+        h.update(b"/" + str(obj.name).encode("utf-8", "replace"))
+    elif isinstance(obj, bytes):
+        h.update(b"b" + obj)
+    else:
+        h.update(repr(obj).encode("utf-8", "replace"))
+    h.update(b";")
+
+
+def font_digest(spec) -> str:
+    h = hashlib.sha1()
+    _feed(h, spec, 0)
+    return h.hexdigest()
+
+
+class CachingResourceManager(PDFResourceManager):
+    """PDFResourceManager that looks fonts up in FONTS before decoding them."""
+
+    def get_font(self, objid, spec):
+        if objid and objid in self._cached_fonts:
+            return self._cached_fonts[objid]
+        try:
+            key = font_digest(spec)
+        except Exception:
+            return super().get_font(objid, spec)
+        font = FONTS.get(key)
+        if font is None:
+            font = super().get_font(objid, spec)
+            FONTS.put(key, font)
+        elif objid and self.caching:
+            self._cached_fonts[objid] = font
+        return font
+
+
+def install(pdf) -> None:
+    """Make an open pdfplumber PDF use the shared font cache (before any page is parsed)."""
+    pdf.rsrcmgr = CachingResourceManager()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="+")
+    args = parser.parse_args(argv)
+
+    import pdfplumber
+
+    from utils.sources import expand_inputs, open_source
+
+    pdfs = [p for p in expand_inputs(args.pdfs) if p.lower().endswith(".pdf")]
+    for cached in (False, True):
+        FONTS.clear()
+        start = time.perf_counter()
+        for path in pdfs:
+            with open_source(path) as src, pdfplumber.open(src) as pdf:
+                if cached:
+                    install(pdf)
+                for page in pdf.pages:
+                    page.extract_text_lines()
+        elapsed = time.perf_counter() - start
+        print(f"{'with' if cached else 'without'} font cache: {elapsed * 1000:.0f} ms for {len(pdfs)} file(s)"
+              + (f", {FONTS.report()}" if cached else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+from typing import Iterable, List, Optional
+
+# Remittances are a few dozen rows, so they are kept as plain slotted records
+# instead of DataFrames; pandas is only imported for to_dataframe() exports.
+
+
+class LineItem(object):
+    __slots__ = ("values", "invoice_number", "amount", "store_key", "store_name")
+
+    def __init__(self, values: list, invoice_number: str, amount: float,
+                 store_key: str = "", store_name: str = "") -> None:
+        self.values = values
+        self.invoice_number = invoice_number
+        self.amount = amount
+        self.store_key = store_key
+        self.store_name = store_name
+
+    def row(self) -> list:
+        return list(self.values) + [self.store_key, self.store_name]
+
+
+class RawRemittance(object):
+    """Output of the extraction stage: table rows and header fields, before store lookup."""
+
+    __slots__ = ("source", "file_hash", "columns", "rows", "tab_name", "check_date")
+
+    def __init__(self, source: str, file_hash: str, columns: List[str], rows: List[list],
+                 tab_name: List[str], check_date: Optional[str] = None) -> None:
+        self.source = source
+        self.file_hash = file_hash
+        self.columns = columns
+        self.rows = rows
+        self.tab_name = tab_name
+        self.check_date = check_date
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RawRemittance":
+        return cls(**{name: d.get(name) for name in cls.__slots__})
+
+
+class DetailTable(object):
+    """Line items of one check, in table order, with the store columns appended."""
+
+    __slots__ = ("columns", "items", "check_date")
+
+    def __init__(self, columns: List[str], items: List[LineItem], check_date: Optional[str] = None) -> None:
+        self.columns = columns
+        self.items = items
+        self.check_date = check_date
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, column: str) -> list:
+        if column == "storeKey":
+            return [item.store_key for item in self.items]
+        if column == "storeName":
+            return [item.store_name for item in self.items]
+        if column == "amount":
+            return [item.amount for item in self.items]
+        idx = self.columns.index(column)
+        return [item.values[idx] for item in self.items]
+
+    @property
+    def header(self) -> List[str]:
+        return list(self.columns) + ["storeKey", "storeName"]
+
+    def rows(self, header: bool = True):
+        if header:
+            yield self.header
+        for item in self.items:
+            yield item.row()
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame([item.row() for item in self.items], columns=self.header)
+
+
+class SummaryTable(object):
+    """Per-store totals of one check, sorted by store name."""
+
+    __slots__ = ("names", "amounts")
+
+    def __init__(self, names: List[str], amounts: List[float]) -> None:
+        self.names = names
+        self.amounts = amounts
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, column: str) -> list:
+        if column == "storeName":
+            return self.names
+        if column == "amount":
+            return self.amounts
+        raise KeyError(column)
+
+    def rows(self, header: bool = True):
+        if header:
+            yield ["storeName", "amount"]
+        for name, amount in zip(self.names, self.amounts):
+            yield [name, amount]
+
+    def total(self) -> float:
+        return array_sum(self.amounts)
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({"storeName": self.names, "amount": self.amounts})
+
+
+def parse_amount(value: Optional[str]) -> float:
+    if value is None:
+        return float("nan")
+    return float(str(value).replace(",", ""))
+
+
+def summarize(items: Iterable[LineItem]) -> SummaryTable:
+    """Group amounts by store name (same results as the old pandas groupby().sum())."""
+    sums, comp = {}, {}
+    for item in items:
+        name, val = item.store_name, item.amount
+        if name not in sums:
+            sums[name], comp[name] = 0.0, 0.0
+        if val != val:
+            continue
+        # compensated summation, as in pandas' group_sum
+        y = val - comp[name]
+        t = sums[name] + y
+        c = t - sums[name] - y
+        comp[name] = 0.0 if c != c else c
+        sums[name] = t
+    names = sorted(sums)
+    return SummaryTable(names, [sums[name] for name in names])
+
+
+def _pairwise_sum(values: List[float]) -> float:
+    n = len(values)
+    if n < 8:
+        res = 0.0
+        for v in values:
+            res += v
+        return res
+    if n <= 128:
+        r = list(values[:8])
+        end = n - n % 8
+        for i in range(8, end, 8):
+            for j in range(8):
+                r[j] += values[i + j]
+        res = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+        for v in values[end:]:
+            res += v
+        return res
+    n2 = n // 2
+    n2 -= n2 % 8
+    return _pairwise_sum(values[:n2]) + _pairwise_sum(values[n2:])
+
+
+def array_sum(values: List[float]) -> float:
+    """Sum with numpy's reduction order, so totals match the old Series.sum() exactly."""
+    return _pairwise_sum([v if v == v else 0.0 for v in values])
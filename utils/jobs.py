@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import wait
+
+from utils.schedule import enrich_results, extract_scheduled, prefetch, reusable
+from utils.tree import CostcoTree
+
+# Report jobs (a file set and an output path) queued from the GUI. Each job
+# runs on its own thread against the app's shared WarmPool, so several months
+# can be parsed side by side while the window stays responsive; the number of
+# jobs allowed to run at once is the queue's max_running.
+
+
+class ReportJob(object):
+    def __init__(self, job_id: int, files, output_path: str, prefetched=None) -> None:
+        self.id = job_id
+        self.files = list(files)
+        self.output_path = output_path
+        self.prefetched = dict(prefetched or {})
+        self.futures = {}
+        self.status = "queued"
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.done = []
+        self.failed = []
+        self.tables = []
+        self.report = None
+        self.tree = None
+        self.cancelled = threading.Event()
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("parsing", "cancelling", "writing")
+
+    def progress(self) -> str:
+        if self.status != "parsing" or not self.futures:
+            return self.status
+        finished = sum(1 for f in self.futures.values() if f.done())
+        return f"parsing {finished}/{len(self.futures)}"
+
+
+class JobQueue(object):
+    def __init__(self, pool, write, max_running: int = 1) -> None:
+        """`write(job, tables)` saves the report; it runs on the job's thread."""
+        self.pool = pool
+        self.write = write
+        self.max_running = max_running
+        self.jobs = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, files, output_path: str, prefetched=None) -> ReportJob:
+        with self._lock:
+            self._next_id += 1
+            job = ReportJob(self._next_id, files, output_path, prefetched)
+            self.jobs.append(job)
+        self.start_next()
+        return job
+
+    def start_next(self) -> None:
+        """Start queued jobs while fewer than max_running are active (call after any job changes)."""
+        with self._lock:
+            running = sum(1 for job in self.jobs if job.active)
+            for job in self.jobs:
+                if running >= max(1, self.max_running):
+                    break
+                if job.status == "queued":
+                    job.status, job.started = "parsing", time.monotonic()
+                    threading.Thread(target=self._run, args=(job,), name=f"report-job-{job.id}", daemon=True).start()
+                    running += 1
+
+    def cancel(self, job: ReportJob) -> None:
+        """Drop a queued job, or stop a parsing one once its files already on a worker finish."""
+        job.cancelled.set()
+        for future in list(job.futures.values()) + list(job.prefetched.values()):
+            future.cancel()
+        if job.status == "queued":
+            job.status, job.finished = "cancelled", time.monotonic()
+        elif job.status == "parsing":
+            job.status = "cancelling"
+
+    def _run(self, job: ReportJob) -> None:
+        try:
+            futures = {p: f for p, f in job.prefetched.items() if reusable(f)}
+            futures.update(prefetch(self.pool, [p for p in job.files if p not in futures]))
+            job.futures = futures
+            if job.cancelled.is_set():
+                self.cancel(job)
+            wait(list(futures.values()))
+            if job.cancelled.is_set():
+                job.status = "cancelled"
+                return
+
+            results, job.report = extract_scheduled(self.pool, job.files, prefetched=futures,
+                                                    retry_failed=False, started=job.started)
+            # stores are resolved here, against the store directory as it is now
+            job.tree = CostcoTree(dir_path="costco", pdf_files=job.files, output_path=job.output_path)
+            results = enrich_results(job.tree, results)
+            job.done = [(p, r) for p, r in zip(job.files, results) if not isinstance(r, Exception)]
+            job.failed = [(p, r) for p, r in zip(job.files, results) if isinstance(r, Exception)]
+            if not job.done:
+                raise job.failed[0][1]
+
+            job.status = "writing"
+            job.tables = [r for _, r in job.done]
+            self.write(job, job.tables)
+            job.status = "done" if not job.failed else f"done, {len(job.failed)} skipped"
+        except Exception as e:
+            job.error = e
+            job.status = "failed"
+        finally:
+            job.finished = time.monotonic()
+            job.prefetched = {}
+            self.start_next()
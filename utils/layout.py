@@ -0,0 +1,127 @@
+import re
+import threading
+from typing import Dict, List
+
+# Remittances from one issuer share a layout: the table sits at the same place
+# and has the same column edges on every page. Once learned from a full-page
+# pass, later pages (and later documents in this process) only run table
+# finding over the learned columns, from the table's top down to the bottom of
+# the page. The bottom is never cropped: a page with more rows than the one
+# the template was learned from has nothing crossing a learned bottom edge to
+# give the cut away (text-strategy tables have no ruling lines).
+
+PAD = 6  # points of slack around the learned table box
+COLUMN_TOL = 2
+
+
+def layout_fingerprint(page, first_line: str, continuation: bool) -> str:
+    """Key for a page layout: page size, issuer line (digits masked) and page role."""
+    issuer = re.sub(r"\d+", "#", first_line or "").strip()
+    role = "cont" if continuation else "first"
+    return f"{round(page.width)}x{round(page.height)}|{issuer}|{role}"
+
+
+def _column_edges(table) -> List[float]:
+    edges = set()
+    for cell in table.rows[0].cells:
+        if cell:
+            edges.add(round(cell[0], 1))
+            edges.add(round(cell[2], 1))
+    return sorted(edges)
+
+
+def _crosses_edge(page, crop_box) -> bool:
+    cx0, ctop, cx1, cbottom = crop_box
+    for obj in page.lines + page.rects + page.chars:
+        if obj["top"] < ctop < obj["bottom"] or obj["top"] < cbottom < obj["bottom"]:
+            if obj["x1"] > cx0 and obj["x0"] < cx1:
+                return True
+        if obj["x0"] < cx0 < obj["x1"] or obj["x0"] < cx1 < obj["x1"]:
+            if obj["bottom"] > ctop and obj["top"] < cbottom:
+                return True
+    return False
+
+
+class TableTemplate(object):
+    def __init__(self, bbox, columns: List[float]) -> None:
+        self.bbox = bbox
+        self.columns = columns
+
+    def crop_box(self, page):
+        x0, top, x1, _ = self.bbox
+        px0, ptop, px1, pbottom = page.bbox
+        return (
+            max(px0, x0 - PAD),
+            max(ptop, top - PAD),
+            min(px1, x1 + PAD),
+            pbottom,
+        )
+
+    def matches(self, page, table, crop_box) -> bool:
+        """Validate a table found inside the crop against the learned layout."""
+        x0, top, x1, bottom = table.bbox
+        cx0, ctop, cx1, cbottom = crop_box
+        # a table touching the crop edge, or ruling/text running across it,
+        # was probably cut off by the crop
+        if x0 <= cx0 + 1 or top <= ctop + 1 or x1 >= cx1 - 1 or bottom >= cbottom - 1:
+            return False
+        if _crosses_edge(page, crop_box):
+            return False
+        columns = _column_edges(table)
+        if len(columns) != len(self.columns):
+            return False
+        return all(abs(a - b) <= COLUMN_TOL for a, b in zip(columns, self.columns))
+
+
+class LayoutCache(object):
+    """Process-level table templates keyed by layout fingerprint."""
+
+    def __init__(self) -> None:
+        self.templates: Dict[str, TableTemplate] = {}
+        self.stats = {"hits": 0, "learned": 0, "relearned": 0}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.templates.clear()
+
+    def learn(self, page, key: str, table_settings=None):
+        table = page.find_table(table_settings)
+        if table is None:
+            return None
+        rows = table.extract()
+        old = self.templates.get(key)
+        bbox = table.bbox
+        if old is not None:
+            # grow rather than replace, so a short last page doesn't shrink the box
+            bbox = (
+                min(bbox[0], old.bbox[0]),
+                min(bbox[1], old.bbox[1]),
+                max(bbox[2], old.bbox[2]),
+                max(bbox[3], old.bbox[3]),
+            )
+        with self._lock:
+            self.templates[key] = TableTemplate(bbox, _column_edges(table))
+            self.stats["relearned" if old is not None else "learned"] += 1
+        return rows
+
+    def extract_table(self, page, key: str, table_settings=None):
+        """Same rows as page.extract_table(), analyzing only the learned region when possible."""
+        template = self.templates.get(key)
+        if template is None:
+            return self.learn(page, key, table_settings)
+
+        crop_box = template.crop_box(page)
+        table = page.crop(crop_box).find_table(table_settings)
+        if table is None or not template.matches(page, table, crop_box):
+            return self.learn(page, key, table_settings)
+
+        rows = table.extract()
+        if not rows:
+            return self.learn(page, key, table_settings)
+
+        self.stats["hits"] += 1
+        return rows
+
+
+LAYOUTS = LayoutCache()
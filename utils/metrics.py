@@ -0,0 +1,264 @@
+"""Counters and latency histograms in Prometheus text format, for unattended runs.
+
+Off unless enable() is called (or COSTCO_TK_METRICS / COSTCO_TK_METRICS_PORT are
+set for enable_from_env()); until then inc()/observe()/set_gauge() return on
+their first line. When on, the registry is written atomically to a
+textfile-collector file every few seconds and/or served on localhost:
+
+    COSTCO_TK_METRICS=/var/lib/node_exporter/textfile/costco.prom
+    COSTCO_TK_METRICS_PORT=9464
+
+WarmPool workers started while metrics are on collect into a registry of
+their own and send what they recorded back with each result (take/merge).
+"""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "costco_"
+FLUSH_INTERVAL = 15  # seconds between textfile writes
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HELP = {
+    "pdfs_total": ("counter", "Documents extracted, by engine."),
+    "pages_total": ("counter", "Pages extracted, by engine."),
+    "rows_total": ("counter", "Invoice rows extracted."),
+    "unresolved_rows_total": ("counter", "Rows whose store key is not in the store directory."),
+    "engine_fallbacks_total": ("counter", "Documents the pypdf engine handed back to pdfplumber."),
+    "files_scheduled_total": ("counter", "Files submitted to the worker pool."),
+    "files_failed_total": ("counter", "Files that failed or timed out on the worker pool."),
+    "worker_busy_seconds_total": ("counter", "Worker time spent extracting."),
+    "stage_seconds": ("histogram", "Latency per stage (parse, resolve, write, extract)."),
+    "workers": ("gauge", "Worker processes in the pool."),
+    "parallel_efficiency": ("gauge", "Busy share of the workers during the last run."),
+    "layout_cache_hits": ("gauge", "Pages cropped with a learned layout template."),
+    "layout_cache_learned": ("gauge", "Layout templates learned."),
+    "font_cache_hits": ("gauge", "Font lookups served from the shared font cache."),
+    "font_cache_misses": ("gauge", "Font lookups that had to decode the font."),
+}
+
+
+class Histogram(object):
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(BUCKETS, value)
+        if idx < len(BUCKETS):
+            self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict, extra=None) -> str:
+    items = sorted(labels.items()) + (extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Registry(object):
+    def __init__(self, labels: dict = None) -> None:
+        self.labels = labels or {}
+        self.values = {}  # (name, labels) -> float (counters, gauges) or Histogram
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def inc(self, name: str, amount: float, labels) -> None:
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, name: str, value: float, labels) -> None:
+        with self.lock:
+            self.values[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels) -> None:
+        key = (name, labels)
+        with self.lock:
+            hist = self.values.get(key)
+            if hist is None:
+                hist = self.values[key] = Histogram()
+            hist.observe(value)
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"metrics collector failed: {e}")
+        with self.lock:
+            items = sorted(self.values.items(), key=lambda kv: kv[0])
+            lines, seen = [], set()
+            for (name, labels), value in items:
+                full = PREFIX + name
+                if name not in seen:
+                    seen.add(name)
+                    kind, text = HELP.get(name, ("untyped", name))
+                    lines.append(f"# HELP {full} {text}")
+                    lines.append(f"# TYPE {full} {kind}")
+                base = dict(self.labels, **dict(labels))
+                if isinstance(value, Histogram):
+                    running = 0
+                    for bound, count in zip(BUCKETS, value.counts):
+                        running += count
+                        lines.append(f"{full}_bucket{_labels(base, [('le', f'{bound:g}')])} {running}")
+                    lines.append(f"{full}_bucket{_labels(base, [('le', '+Inf')])} {value.count}")
+                    lines.append(f"{full}_sum{_labels(base)} {value.sum:.6f}")
+                    lines.append(f"{full}_count{_labels(base)} {value.count}")
+                else:
+                    lines.append(f"{full}{_labels(base)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        # the collector may read at any moment: write next to it, then rename over
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = None
+_textfile = None
+_server = None
+# cache counts as of the last take() in this process / as shipped in by worker processes
+_shipped_caches = {}
+_remote_caches = {}
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    if REGISTRY is None:
+        return
+    REGISTRY.inc(name, amount, tuple(sorted(labels.items())))
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    if REGISTRY is None:
+        return
+    REGISTRY.observe(name, seconds, tuple(sorted(labels.items())))
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    if REGISTRY is None:
+        return
+    REGISTRY.set(name, value, tuple(sorted(labels.items())))
+
+
+def enabled() -> bool:
+    return REGISTRY is not None
+
+
+def _cache_stats() -> dict:
+    from utils import font_cache
+    from utils.layout import LAYOUTS
+
+    return {
+        "layout_cache_hits": LAYOUTS.stats["hits"],
+        "layout_cache_learned": LAYOUTS.stats["learned"] + LAYOUTS.stats["relearned"],
+        "font_cache_hits": font_cache.FONTS.hits,
+        "font_cache_misses": font_cache.FONTS.misses,
+    }
+
+
+def _collect_caches() -> None:
+    for name, value in _cache_stats().items():
+        set_gauge(name, value + _remote_caches.get(name, 0))
+
+
+def take():
+    """What this process recorded since the last take(), for a worker to ship to its parent."""
+    if REGISTRY is None:
+        return None
+    with REGISTRY.lock:
+        values, REGISTRY.values = REGISTRY.values, {}
+    caches = {}
+    for name, value in _cache_stats().items():
+        caches[name] = value - _shipped_caches.get(name, 0)
+        _shipped_caches[name] = value
+    return {"values": values, "caches": caches}
+
+
+def merge(delta) -> None:
+    """Add a worker's take() to this process's registry."""
+    if REGISTRY is None or not delta:
+        return
+    with REGISTRY.lock:
+        for key, value in delta["values"].items():
+            if isinstance(value, Histogram):
+                hist = REGISTRY.values.get(key)
+                if hist is None:
+                    hist = REGISTRY.values[key] = Histogram()
+                hist.counts = [a + b for a, b in zip(hist.counts, value.counts)]
+                hist.sum += value.sum
+                hist.count += value.count
+            else:
+                REGISTRY.values[key] = REGISTRY.values.get(key, 0) + value
+        for name, value in delta["caches"].items():
+            _remote_caches[name] = _remote_caches.get(name, 0) + value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _flush_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        flush()
+
+
+def flush() -> None:
+    """Write the textfile now (also done every FLUSH_INTERVAL seconds and at the end of a run)."""
+    if REGISTRY is None or _textfile is None:
+        return
+    try:
+        REGISTRY.write_textfile(_textfile)
+    except OSError as e:
+        print(f"Could not write metrics to {_textfile}: {e}")
+
+
+def enable(textfile: str = None, port: int = None, labels: dict = None, interval: float = FLUSH_INTERVAL):
+    """Start collecting; write to `textfile` and/or serve http://127.0.0.1:`port`/metrics."""
+    global REGISTRY, _textfile, _server
+    if REGISTRY is not None:
+        return REGISTRY
+    REGISTRY = Registry(labels)
+    REGISTRY.collectors.append(_collect_caches)
+    if textfile:
+        _textfile = textfile
+        threading.Thread(target=_flush_loop, args=(interval,), name="metrics-textfile", daemon=True).start()
+    if port:
+        _server = ThreadingHTTPServer(("127.0.0.1", int(port)), _Handler)
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"metrics on http://127.0.0.1:{port}/metrics")
+    return REGISTRY
+
+
+def enable_from_env(labels: dict = None):
+    textfile = os.environ.get("COSTCO_TK_METRICS")
+    port = os.environ.get("COSTCO_TK_METRICS_PORT")
+    if textfile or port:
+        return enable(textfile=textfile, port=int(port) if port else None, labels=labels)
+    return None
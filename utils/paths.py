@@ -0,0 +1,21 @@
+import hashlib
+import os
+
+
+def app_dir() -> str:
+    """Per-user folder for settings and caches (override with COSTCO_TK_HOME)."""
+    path = os.environ.get("COSTCO_TK_HOME") or os.path.join(os.path.expanduser("~"), ".costco-tk")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def app_file(name: str) -> str:
+    return os.path.join(app_dir(), name)
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
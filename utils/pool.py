@@ -0,0 +1,338 @@
+import datetime
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from multiprocessing.connection import wait as wait_connections
+
+from utils import metrics
+from utils.paths import app_file
+
+# Long-lived worker processes shared by every run in an app session. Workers
+# only do the extraction stage (RawRemittance); stores are resolved in the
+# parent against the store directory as it is at Generate time. The parent
+# supervises every task and kills (then replaces) a worker whose file runs
+# past its budget.
+
+DEFAULT_TIMEOUT = 120  # wall-clock seconds per file
+DEFAULT_MAX_PAGES = 500
+TIMEOUT_LOG = "timeouts.jsonl"
+
+# per-process state, set up by _warm_up in each worker
+_tree = None
+_progress = None
+
+
+class FileTimeout(Exception):
+    def __init__(self, path, seconds, page, pages) -> None:
+        super().__init__(f"{os.path.basename(path)} took longer than {seconds:g}s (page {page} of {pages or '?'})")
+        self.path = path
+        self.seconds = seconds
+        self.page = page
+        self.pages = pages
+
+
+class PageBudgetExceeded(Exception):
+    pass
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+def default_workers() -> int:
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def _warm_up(dir_path: str) -> None:
+    global _tree
+    # pay the heavy imports up front instead of on the first Generate click
+    import pdfplumber  # noqa: F401
+    from utils.tree import CostcoTree
+
+    _tree = CostcoTree(dir_path=dir_path, pdf_files=[], output_path="")
+
+
+def worker_tree():
+    if _tree is None:
+        _warm_up("costco")
+    return _tree
+
+
+def engine_report() -> str:
+    """This worker's engine timings (submit it to a one-worker pool)."""
+    return worker_tree().engine_report()
+
+
+def extract_raw(pdf_path: str, max_pages: int = None, persist: bool = True):
+    def on_page(page, pages):
+        if _progress is not None:
+            _progress[0], _progress[1] = page, pages
+        if max_pages and pages > max_pages:
+            raise PageBudgetExceeded(f"{os.path.basename(pdf_path)} has {pages} pages (budget {max_pages})")
+
+    return worker_tree().extract_raw(pdf_path, on_page=on_page, persist=persist)
+
+
+def _worker_main(conn, progress, dir_path, collect_metrics=False):
+    global _progress
+    _progress = progress
+    if collect_metrics:
+        # no textfile or port here: counts go back to the parent with every result
+        metrics.enable()
+    _warm_up(dir_path)
+    conn.send(("ready", None, None, None))
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg is None:
+            break
+        task_id, fn, args, kwargs = msg
+        progress[0], progress[1] = 0, 0
+        try:
+            ok, value = True, fn(*args, **kwargs)
+        except BaseException as e:
+            ok, value = False, e
+        delta = metrics.take()
+        try:
+            conn.send((task_id, ok, value, delta))
+        except Exception as e:
+            # unpicklable result or exception
+            conn.send((task_id, False, RuntimeError(repr(e)), delta))
+
+
+def record_timeout(event: dict) -> None:
+    try:
+        with open(app_file(TIMEOUT_LOG), "a") as f:
+            f.write(json.dumps(event) + "\n")
+    except OSError as e:
+        print(f"Could not record timeout: {e}")
+
+
+class _Task(object):
+    __slots__ = ("future", "fn", "args", "kwargs", "timeout", "label", "urgent")
+
+    def __init__(self, future, fn, args, kwargs, timeout=None, label=None, urgent=False) -> None:
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+        self.label = label
+        self.urgent = urgent
+
+
+class _Worker(object):
+    def __init__(self, ctx, dir_path: str) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.progress = ctx.Array("i", 2, lock=False)
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, self.progress, dir_path, metrics.enabled()),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.task = None
+        self.task_id = None
+        self.started = None
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join(2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WarmPool(Executor):
+    """Supervised process pool that is started once per app session and reused across runs."""
+
+    def __init__(self, dir_path: str = "costco", max_workers: int = None,
+                 timeout: float = DEFAULT_TIMEOUT, max_pages: int = DEFAULT_MAX_PAGES) -> None:
+        self.dir_path = dir_path
+        self.max_workers = max_workers or default_workers()
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self._ctx = multiprocessing.get_context("spawn")
+        self._tasks = queue.Queue()
+        self._workers = []
+        self._thread = None
+        self._stopping = False
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Spawn every worker now so they are warm before the first run."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._workers = [_Worker(self._ctx, self.dir_path) for _ in range(self.max_workers)]
+            self._thread = threading.Thread(target=self._supervise, name="warm-pool", daemon=True)
+            self._thread.start()
+
+    def warm(self, timeout=None) -> bool:
+        """Block until all workers have finished warming up."""
+        self.start()
+        deadline = time.monotonic() + timeout if timeout else None
+        while not all(w.ready for w in list(self._workers)):
+            if deadline and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        return self._submit(_Task(Future(), fn, args, kwargs))
+
+    def submit_next(self, fn, /, *args, timeout: float = None, label: str = None, **kwargs) -> Future:
+        """Like submit(), but ahead of everything still waiting for a worker.
+
+        `timeout` (seconds) is enforced like submit_file()'s; it and `label` are not passed to fn.
+        """
+        return self._submit(_Task(Future(), fn, args, kwargs, timeout=timeout, label=label, urgent=True))
+
+    def submit_file(self, pdf_path: str, timeout: float = None, max_pages: int = None,
+                    persist: bool = True) -> Future:
+        """Extract one PDF under the pool's wall-clock and page budgets."""
+        max_pages = self.max_pages if max_pages is None else max_pages
+        task = _Task(Future(), extract_raw, (pdf_path,), {"max_pages": max_pages, "persist": persist},
+                     timeout=timeout or self.timeout, label=pdf_path)
+        return self._submit(task)
+
+    def _submit(self, task) -> Future:
+        self.start()
+        self._tasks.put(task)
+        return task.future
+
+    def _supervise(self) -> None:
+        pending = []
+        while not self._stopping:
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task.urgent:
+                    pending.insert(sum(1 for t in pending if t.urgent), task)
+                else:
+                    pending.append(task)
+
+            for worker in self._workers:
+                if worker.ready and worker.task is None and pending:
+                    task = pending.pop(0)
+                    if not task.future.set_running_or_notify_cancel():
+                        continue
+                    self._next_id += 1
+                    worker.task, worker.task_id, worker.started = task, self._next_id, time.monotonic()
+                    self._dispatch(worker)
+
+            conns = {w.conn: w for w in self._workers}
+            for conn in wait_connections(list(conns), timeout=0.05):
+                self._receive(conns[conn])
+
+            now = time.monotonic()
+            for worker in list(self._workers):
+                task = worker.task
+                if task is not None and task.timeout and now - worker.started > task.timeout:
+                    self._time_out(worker, now - worker.started)
+
+        for task in pending:
+            task.future.cancel()
+
+    def _dispatch(self, worker) -> None:
+        task = worker.task
+        try:
+            worker.conn.send((worker.task_id, task.fn, task.args, task.kwargs))
+        except OSError:
+            self._replace(worker)
+            task.future.set_exception(WorkerCrashed(f"worker died before starting {self._label(task)}"))
+        except Exception as e:
+            # the task itself can't be pickled; nothing reached the worker
+            worker.task = None
+            task.future.set_exception(RuntimeError(repr(e)))
+
+    def _receive(self, worker) -> None:
+        try:
+            task_id, ok, value, delta = worker.conn.recv()
+        except (EOFError, OSError):
+            task = worker.task
+            self._replace(worker)
+            if task is not None:
+                task.future.set_exception(WorkerCrashed(f"worker died while processing {self._label(task)}"))
+            return
+        except Exception as e:
+            # the message arrived whole but won't unpickle here (e.g. an exception
+            # whose __init__ takes other arguments than its message)
+            task, worker.task = worker.task, None
+            if task is not None:
+                task.future.set_exception(RuntimeError(repr(e)))
+            return
+        metrics.merge(delta)
+        if task_id == "ready":
+            worker.ready = True
+            return
+        task, worker.task = worker.task, None
+        if task is None or task_id != worker.task_id:
+            return
+        # wall time the task held its worker, used for scheduling stats
+        task.future.elapsed = time.monotonic() - worker.started
+        if ok:
+            task.future.set_result(value)
+        else:
+            task.future.set_exception(value)
+
+    @staticmethod
+    def _label(task) -> str:
+        return task.label or getattr(task.fn, "__name__", repr(task.fn))
+
+    def _time_out(self, worker, elapsed) -> None:
+        task = worker.task
+        page, pages = worker.progress[0], worker.progress[1]
+        self._replace(worker)
+        err = FileTimeout(self._label(task), task.timeout, page, pages)
+        record_timeout({
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "path": task.label,
+            "timeout": task.timeout,
+            "elapsed": round(elapsed, 2),
+            "page": page,
+            "pages": pages,
+        })
+        print(f"Killed worker: {err}")
+        task.future.set_exception(err)
+
+    def _replace(self, worker) -> None:
+        worker.kill()
+        idx = self._workers.index(worker)
+        if not self._stopping:
+            self._workers[idx] = _Worker(self._ctx, self.dir_path)
+
+    def shutdown(self, wait=True, *, cancel_futures=False) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping = True
+        thread.join()
+        for worker in self._workers:
+            if worker.task is not None:
+                worker.task.future.cancel() or worker.task.future.set_exception(WorkerCrashed("pool shut down"))
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(5 if wait else 0)
+            if worker.process.is_alive():
+                worker.kill()
+        self._workers = []
+        while True:
+            try:
+                self._tasks.get_nowait().future.cancel()
+            except queue.Empty:
+                break
@@ -0,0 +1,102 @@
+import os
+
+from PyPDF2 import PdfReader
+
+from utils.items import parse_amount
+from utils.pypdf_engine import group_lines, page_fragments, page_table, printed_total
+from utils.sources import display_name, open_source
+from utils.structured import is_structured, read_remittance
+from utils.tree import extract_check_date, extract_payment_id
+
+# Quick look at a remittance before the full run: date and payment number from
+# the header of page 1, the page count from the page tree, and the total. The
+# total is exact only when the last page prints one (or the file is a CSV/XLSX
+# export); otherwise it is an estimate from the rows of page 1 and the last
+# page, since nothing confirms those rows are complete.
+
+PREVIEW_TIMEOUT = 30  # wall-clock seconds per file; a preview only reads two pages
+
+
+class Preview(object):
+    __slots__ = ("source", "check_date", "payment", "pages", "total", "exact")
+
+    def __init__(self, source, check_date=None, payment=None, pages=None, total=None, exact=False) -> None:
+        self.source = source
+        self.check_date = check_date
+        self.payment = payment
+        self.pages = pages
+        self.total = total
+        self.exact = exact
+
+    def __str__(self) -> str:
+        parts = [display_name(self.source), self.check_date or "?", f"#{self.payment or '?'}"]
+        if self.pages:
+            parts.append(f"{self.pages} p")
+        if self.total is not None:
+            parts.append(f"{'' if self.exact else '≈ '}${self.total:,.2f}")
+        return "  ·  ".join(parts)
+
+
+def _page_amounts(lines):
+    table = page_table(lines)
+    return _amounts(table) if table else []
+
+
+def _amounts(table):
+    header = [str(h or "").replace("\n", " ").strip().lower() for h in table[0]]
+    if "amount" not in header:
+        return []
+    col = header.index("amount")
+    amounts = []
+    for row in table[1:]:
+        try:
+            amounts.append(parse_amount(row[col]))
+        except (TypeError, ValueError, IndexError):
+            pass
+    return amounts
+
+
+def preview_file(path: str) -> Preview:
+    if is_structured(path):
+        raw = read_remittance(path)
+        amounts = [parse_amount(row[raw.columns.index("amount")]) for row in raw.rows]
+        return Preview(path, raw.check_date, raw.tab_name[1], None, sum(amounts), exact=True)
+
+    with open_source(path) as src:
+        pages = PdfReader(src, strict=False).pages
+        if not len(pages):
+            raise ValueError(f"{os.path.basename(path)} has no pages")
+        lines = group_lines(page_fragments(pages[0]))
+        last_lines = group_lines(page_fragments(pages[-1])) if len(pages) > 1 else None
+    texts = [" ".join(f.text for f in line) for line in lines]
+    last = [" ".join(f.text for f in line) for line in last_lines] if last_lines else texts
+
+    preview = Preview(path, pages=len(pages))
+    for text in texts:
+        if preview.check_date is None and text.startswith("Date"):
+            preview.check_date = extract_check_date(text)[1]
+        if preview.payment is None:
+            preview.payment = extract_payment_id(text)[1]
+
+    preview.total = printed_total(last)
+    if preview.total is not None:
+        preview.exact = True
+        return preview
+
+    first = _page_amounts(lines)
+    if not first:
+        return preview
+    preview.total = sum(first)
+    if not last_lines:
+        return preview
+
+    average = sum(first) / len(first)
+    rest = _page_amounts(last_lines)
+    if rest:
+        # middle pages: the first page's average amount times the fuller of the two pages
+        middle = len(pages) - 2
+        preview.total += sum(rest) + middle * max(len(first), len(rest)) * average
+    else:
+        # no header row to rebuild the last page from
+        preview.total += (len(pages) - 1) * len(first) * average
+    return preview
@@ -0,0 +1,210 @@
+import re
+from typing import List
+
+from PyPDF2 import PdfReader
+
+from utils.items import parse_amount
+from utils.sources import open_source
+
+# Text-layer extraction engine: a PyPDF2 content-stream visitor records where
+# each text fragment is drawn, and table rows are rebuilt from those positions
+# using the column starts of the printed header. No layout analysis, so it is
+# much cheaper than pdfplumber on machine-generated remittances. It yields
+# the same per-page (text lines, table) shape as the pdfplumber path, and the
+# caller validates the rows and falls back to pdfplumber when they look wrong.
+
+LINE_TOL = 2.0  # points; fragments closer than this vertically share a line
+COLUMN_TOL = 3.0
+HEADER_MAX_LINES = 4
+TOTAL_RE = re.compile(r"\btotal\b[^\d-]*(-?[\d,]+\.\d{2})", re.IGNORECASE)
+
+
+class EngineMismatch(Exception):
+    """The document doesn't have the layout this engine can rebuild."""
+
+
+class Fragment(object):
+    __slots__ = ("x", "y", "text")
+
+    def __init__(self, x: float, y: float, text: str) -> None:
+        self.x = x
+        self.y = y
+        self.text = text
+
+
+def page_fragments(page) -> List[Fragment]:
+    frags = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        text = text.strip()
+        if not text:
+            return
+        # text origin in user space: tm applied, then the current transformation matrix
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        for i, part in enumerate(text.split("\n")):
+            if part.strip():
+                frags.append(Fragment(x, y - i * (font_size or 0), part.strip()))
+
+    page.extract_text(visitor_text=visitor)
+    return frags
+
+
+def group_lines(frags: List[Fragment]) -> List[List[Fragment]]:
+    """Fragments grouped into text lines, top of the page first, each sorted left to right."""
+    lines = []
+    for frag in sorted(frags, key=lambda f: -f.y):
+        if lines and abs(lines[-1][0].y - frag.y) <= LINE_TOL:
+            lines[-1].append(frag)
+        else:
+            lines.append([frag])
+    return [sorted(line, key=lambda f: f.x) for line in lines]
+
+
+def _header_band(lines):
+    for h, line in enumerate(lines):
+        if any(f.text.lower().startswith("invoice") for f in line):
+            for k in range(h, min(h + HEADER_MAX_LINES, len(lines))):
+                if any("amount" in f.text.lower() for f in lines[k]):
+                    return h, k
+            break
+    return None
+
+
+def _columns(band):
+    """Column starts and header cell texts (multi-line headers joined with a newline)."""
+    starts, cells = [], []
+    for line in band:
+        for frag in line:
+            for i, x in enumerate(starts):
+                if abs(x - frag.x) <= COLUMN_TOL:
+                    cells[i].append(frag.text)
+                    break
+            else:
+                starts.append(frag.x)
+                cells.append([frag.text])
+    order = sorted(range(len(starts)), key=lambda i: starts[i])
+    return [starts[i] for i in order], ["\n".join(cells[i]) for i in order]
+
+
+def _column_of(x, starts):
+    if x < starts[0] - COLUMN_TOL:
+        return None
+    col = 0
+    for i, start in enumerate(starts):
+        if x >= start - COLUMN_TOL:
+            col = i
+    return col
+
+
+def _looks_like_row(row, invoice_col, amount_col) -> bool:
+    if amount_col is None or not row[amount_col] or not any(c.isdigit() for c in row[invoice_col]):
+        return False
+    try:
+        float(row[amount_col].replace(",", ""))
+    except ValueError:
+        return False
+    return True
+
+
+def _line_cells(line, starts):
+    row = [""] * len(starts)
+    for frag in line:
+        col = _column_of(frag.x, starts)
+        if col is None:
+            return None
+        row[col] = f"{row[col]} {frag.text}" if row[col] else frag.text
+    return row
+
+
+def _join_cells(upper, lower):
+    return [f"{a}\n{b}" if a and b else a or b for a, b in zip(upper, lower)]
+
+
+def page_table(lines):
+    """Header row plus data rows for one page, or None when the page has no table header.
+
+    A line with neither an invoice number nor an amount is a wrapped cell and joins
+    the row it sits closer to (as pdfplumber joins a cell's lines with a newline).
+    The table ends at the first other line; an invoice row after that means the
+    table was interrupted and raises EngineMismatch rather than losing rows.
+    """
+    band = _header_band(lines)
+    if band is None:
+        return None
+    h, k = band
+    starts, header = _columns(lines[h:k + 1])
+    names = [t.replace("\n", " ").lower() for t in header]
+    amount_col = next((i for i, t in enumerate(names) if t == "amount"), None)
+    invoice_col = next((i for i, t in enumerate(names) if t.startswith("invoice") and "date" not in t), 0)
+
+    # (y, cells, is_row) for the lines that belong to the table
+    entries = []
+    rest = lines[k + 1:]
+    for n, line in enumerate(rest):
+        row = _line_cells(line, starts)
+        if row is not None and _looks_like_row(row, invoice_col, amount_col):
+            entries.append((line[0].y, row, True))
+        elif (row is not None and not row[invoice_col] and (amount_col is None or not row[amount_col])
+              and not TOTAL_RE.search(" ".join(f.text for f in line))):
+            entries.append((line[0].y, row, False))
+        else:
+            for later in rest[n + 1:]:
+                cells = _line_cells(later, starts)
+                if cells is not None and _looks_like_row(cells, invoice_col, amount_col):
+                    raise EngineMismatch(f"invoice row after the end of the table: {' '.join(cells).strip()}")
+            break
+
+    # runs of wrapped lines between rows; each run joins whichever row it is closer to.
+    # Below the last row only a run no further away than rows are from each other
+    # counts, anything else there is footer text.
+    ys = [y for y, _, is_row in entries if is_row]
+    pitch = min([a - b for a, b in zip(ys, ys[1:])] or [lines[k][0].y - ys[0] if ys else 0]) + LINE_TOL
+    if ys:
+        last = max(i for i, e in enumerate(entries) if e[2])
+        end = last + 1
+        while end < len(entries) and entries[end - 1][0] - entries[end][0] <= pitch:
+            end += 1
+        entries = entries[:end]
+    table, pending, run = [header], None, []
+    for y, cells, is_row in entries + [(None, None, True)]:
+        if not is_row:
+            run.append((y, cells))
+            continue
+        if run:
+            joined = run[0][1]
+            for _, more in run[1:]:
+                joined = _join_cells(joined, more)
+            above = last_y - run[0][0] if len(table) > 1 else None
+            below = run[-1][0] - y if y is not None else None
+            if above is not None and (below is None or above <= below):
+                table[-1] = _join_cells(table[-1], joined)
+            elif below is not None:
+                pending = joined
+        if y is None:
+            break
+        table.append(_join_cells(pending, cells) if pending else cells)
+        pending, run, last_y = None, [], y
+    return table
+
+
+def printed_total(texts):
+    """The amount on the last "Total" line of a page's text, or None."""
+    for text in reversed(texts):
+        match = TOTAL_RE.search(text)
+        if match:
+            return parse_amount(match.group(1))
+    return None
+
+
+def iter_pages(pdf_path):
+    """(page number, page count, text lines, table) for every page of the document."""
+    with open_source(pdf_path) as src:
+        pages = PdfReader(src, strict=False).pages
+        for i, page in enumerate(pages):
+            lines = group_lines(page_fragments(page))
+            texts = [" ".join(f.text for f in line) for line in lines]
+            table = page_table(lines)
+            if table is None:
+                raise EngineMismatch(f"no table header on page {i + 1}")
+            yield i + 1, len(pages), texts, table
@@ -0,0 +1,97 @@
+"""Persisted output of the extraction stage, so stores can be re-resolved without pdfplumber.
+
+    python -m utils.raw_store list
+    python -m utils.raw_store reresolve [--archive]
+    python -m utils.raw_store report out.xlsx [PAYMENT ...]
+"""
+import argparse
+import json
+import os
+import time
+
+from utils.items import RawRemittance
+from utils.paths import app_file
+
+RAW_DIR = "raw"
+
+
+class RawStore(object):
+    """One JSON file per extracted PDF, named by the PDF's sha256."""
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path or app_file(RAW_DIR)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, digest: str) -> str:
+        return os.path.join(self.path, f"{digest}.json")
+
+    def save(self, raw: RawRemittance) -> None:
+        path = self._file(raw.file_hash)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(raw.to_dict(), f)
+        os.replace(tmp, path)
+
+    def load(self, digest: str):
+        try:
+            with open(self._file(digest)) as f:
+                return RawRemittance.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def all(self):
+        raws = []
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                raw = self.load(name[:-5])
+                if raw is not None:
+                    raws.append(raw)
+        return sorted(raws, key=lambda r: (r.check_date or "", r.tab_name[1] if len(r.tab_name) > 1 else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Work with persisted extraction results.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="list extracted checks")
+    p = sub.add_parser("reresolve", help="re-run store lookup against the current store directory")
+    p.add_argument("--archive", action="store_true", help="also replace the archived line items")
+    p = sub.add_parser("report", help="write a report from extracted checks without re-parsing PDFs")
+    p.add_argument("out")
+    p.add_argument("payments", nargs="*", help="payment numbers, in sheet order (default: all)")
+    args = parser.parse_args(argv)
+
+    from utils.tree import CostcoTree
+
+    store = RawStore()
+    raws = store.all()
+    if args.cmd == "list":
+        for raw in raws:
+            print(f"{raw.check_date or '?':<10}  #{raw.tab_name[1]:<10} {len(raw.rows):>5} row(s)  {raw.source}")
+        return
+
+    cct = CostcoTree(dir_path="costco", pdf_files=[], output_path=getattr(args, "out", ""))
+    if args.cmd == "reresolve":
+        from utils.archive import Archive
+
+        archive = Archive() if args.archive else None
+        start = time.perf_counter()
+        unknown = 0
+        for raw in raws:
+            df, df2, tab_name = cct.enrich(raw)
+            unknown += sum(1 for item in df.items if item.store_key == "0000")
+            if archive is not None:
+                archive.ingest(df, df2, tab_name, source=raw.source, digest=raw.file_hash, replace=True)
+        elapsed = time.perf_counter() - start
+        print(f"re-resolved {len(raws)} check(s) in {elapsed * 1000:.0f} ms, {unknown} row(s) still unknown")
+    elif args.cmd == "report":
+        if args.payments:
+            by_payment = {raw.tab_name[1]: raw for raw in raws}
+            missing = [p for p in args.payments if p not in by_payment]
+            if missing:
+                parser.error(f"not extracted yet: {', '.join(missing)}")
+            raws = [by_payment[p] for p in args.payments]
+        cct.write_report([cct.enrich(raw) for raw in raws])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import time
+from concurrent.futures import Future, wait
+
+from utils import metrics
+from utils.pool import PageBudgetExceeded
+from utils.sources import open_source, source_size
+
+# Files are dispatched longest-first (LPT) so the biggest remittance doesn't
+# start last and leave the other workers idle; results are handed back in the
+# order the user picked the files. The GUI starts this as soon as files are
+# added (prefetch) and Generate only waits for whatever hasn't finished yet.
+
+
+def page_count(path: str) -> int:
+    """Page count from the PDF page tree only (no content parsing); 0 if unreadable."""
+    try:
+        from PyPDF2 import PdfReader
+
+        with open_source(path) as src:
+            return len(PdfReader(src, strict=False).pages)
+    except Exception:
+        return 0
+
+
+def longest_first(paths, counts):
+    """Dispatch order: most pages first, larger files first on ties."""
+    return sorted(range(len(paths)), key=lambda i: (-counts[i], -source_size(paths[i]), i))
+
+
+class ScheduleReport(object):
+    def __init__(self, files: int, pages: int, workers: int, wall: float, busy: float) -> None:
+        self.files = files
+        self.pages = pages
+        self.workers = workers
+        self.wall = wall
+        self.busy = busy
+
+    @property
+    def efficiency(self) -> float:
+        """Share of worker time spent parsing: busy / (wall * usable workers)."""
+        usable = min(self.workers, self.files)
+        if not usable or not self.wall:
+            return 0.0
+        return min(1.0, self.busy / (self.wall * usable))
+
+    def __str__(self) -> str:
+        return (f"{self.files} file(s), {self.pages} page(s) in {self.wall:.1f}s "
+                f"on {min(self.workers, self.files)} worker(s), {self.efficiency:.0%} parallel efficiency")
+
+
+def _finished(future) -> None:
+    future.finished = time.monotonic()
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        metrics.inc("files_failed_total")
+    if hasattr(future, "elapsed"):
+        metrics.observe("stage_seconds", future.elapsed, stage="extract")
+        metrics.inc("worker_busy_seconds_total", future.elapsed)
+
+
+def _busy_since(future, start: float) -> float:
+    """Worker seconds the future's file took at or after `start`."""
+    elapsed = getattr(future, "elapsed", 0.0)
+    finished = getattr(future, "finished", None)
+    return elapsed if finished is None else max(0.0, min(elapsed, finished - start))
+
+
+def reusable(future) -> bool:
+    """False for a prefetched future that was cancelled or failed; its file is submitted again."""
+    return not future.cancelled() and not (future.done() and future.exception() is not None)
+
+
+def prefetch(pool, paths, timeout: float = None, max_pages: int = None):
+    """Submit every file longest-first without waiting; {path: future}."""
+    max_pages = pool.max_pages if max_pages is None else max_pages
+    paths = list(dict.fromkeys(paths))
+    counts = [page_count(p) for p in paths]
+    futures = {}
+    for i in longest_first(paths, counts):
+        if max_pages and counts[i] > max_pages:
+            # no need to spend a worker on a file we already know is over budget
+            future = Future()
+            future.set_exception(PageBudgetExceeded(
+                f"{os.path.basename(paths[i])} has {counts[i]} pages (budget {max_pages})"))
+        else:
+            future = pool.submit_file(paths[i], timeout=timeout, max_pages=max_pages)
+        future.pages, future.submitted = counts[i], time.monotonic()
+        metrics.inc("files_scheduled_total")
+        future.add_done_callback(_finished)
+        futures[paths[i]] = future
+    return futures
+
+
+def extract_scheduled(pool, paths, timeout: float = None, max_pages: int = None, prefetched=None,
+                      retry_failed: bool = True, started: float = None):
+    """Extract every file on the pool longest-first.
+
+    Returns (results, report); results are in the order of `paths`, with the
+    exception in place of the RawRemittance for files that failed.
+    `prefetched` maps paths to futures from an earlier prefetch() call; files
+    whose future already failed are extracted again unless `retry_failed` is
+    False (for futures submitted for this same run). The report covers the
+    time from `started` (time.monotonic(), default now) on, when this run began
+    dispatching; parsing done earlier by a prefetch doesn't count.
+    """
+    start = time.monotonic() if started is None else started
+    futures = {p: f for p, f in (prefetched or {}).items()
+               if (reusable(f) if retry_failed else not f.cancelled())}
+    futures.update(prefetch(pool, [p for p in paths if p not in futures], timeout, max_pages))
+    used = [futures[p] for p in dict.fromkeys(paths)]
+    wait(used)
+    results = [futures[p].exception() or futures[p].result() for p in paths]
+
+    now = time.monotonic()
+    wall = max(0.0, max((getattr(f, "finished", now) for f in used), default=start) - start)
+    busy = sum(_busy_since(f, start) for f in used)
+    report = ScheduleReport(len(used), sum(f.pages for f in used), pool.max_workers, wall, busy)
+    metrics.set_gauge("workers", pool.max_workers)
+    metrics.set_gauge("parallel_efficiency", report.efficiency)
+    return results, report
+
+
+def enrich_results(tree, results):
+    """(df1, df2, tab_name) for each raw extraction, resolved by `tree` in this process.
+
+    Exceptions (and files whose rows can't be resolved) stay in place as exceptions.
+    """
+    tables = []
+    for raw in results:
+        if isinstance(raw, Exception):
+            tables.append(raw)
+            continue
+        try:
+            tables.append(tree.enrich(raw))
+        except Exception as e:
+            tables.append(e)
+    return tables
@@ -0,0 +1,101 @@
+import contextlib
+import hashlib
+import io
+import os
+import zipfile
+
+from utils.paths import file_hash
+
+# Inputs are either plain file paths or members of a .zip archive, written as
+# "<archive>.zip!/<member>". Members are read straight into memory and handed
+# to pdfplumber/PyPDF2/csv as streams, so archives never need unpacking.
+
+MEMBER_SEP = "!/"
+INPUT_EXTENSIONS = (".pdf", ".csv", ".xlsx")
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(".zip") and MEMBER_SEP not in path
+
+
+def split_member(ref: str):
+    """(archive path, member name) for an archive member, else (ref, None)."""
+    idx = ref.lower().find(".zip" + MEMBER_SEP)
+    if idx < 0:
+        return ref, None
+    cut = idx + len(".zip")
+    return ref[:cut], ref[cut + len(MEMBER_SEP):]
+
+
+def member_ref(archive: str, member: str) -> str:
+    return f"{archive}{MEMBER_SEP}{member}"
+
+
+def archive_members(archive: str):
+    with zipfile.ZipFile(archive) as zf:
+        return [
+            member_ref(archive, info.filename)
+            for info in zf.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and not os.path.basename(info.filename).startswith(".")
+            and info.filename.lower().endswith(INPUT_EXTENSIONS)
+        ]
+
+
+def expand_inputs(paths):
+    """Replace every .zip in `paths` with its remittance members, keeping order."""
+    refs = []
+    for path in paths:
+        refs.extend(archive_members(path) if is_archive(path) else [path])
+    return refs
+
+
+def display_name(ref: str) -> str:
+    archive, member = split_member(ref)
+    if member is None:
+        return os.path.basename(ref)
+    return f"{os.path.basename(archive)} › {os.path.basename(member)}"
+
+
+def read_bytes(ref: str) -> bytes:
+    archive, member = split_member(ref)
+    if member is None:
+        with open(ref, "rb") as f:
+            return f.read()
+    with zipfile.ZipFile(archive) as zf:
+        return zf.read(member)
+
+
+@contextlib.contextmanager
+def open_source(ref: str):
+    """A path for plain files, an in-memory stream for archive members."""
+    archive, member = split_member(ref)
+    if member is None:
+        yield ref
+    else:
+        yield io.BytesIO(read_bytes(ref))
+
+
+def source_hash(ref: str) -> str:
+    if split_member(ref)[1] is None:
+        return file_hash(ref)
+    return hashlib.sha256(read_bytes(ref)).hexdigest()
+
+
+def source_size(ref: str) -> int:
+    archive, member = split_member(ref)
+    try:
+        if member is None:
+            return os.path.getsize(ref)
+        with zipfile.ZipFile(archive) as zf:
+            return zf.getinfo(member).file_size
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return 0
+
+
+def source_mtime(ref: str) -> float:
+    try:
+        return os.path.getmtime(split_member(ref)[0])
+    except OSError:
+        return 0.0
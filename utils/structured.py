@@ -0,0 +1,144 @@
+import csv
+import io
+import os
+import re
+
+from utils.items import RawRemittance
+from utils.sources import open_source, source_hash
+from utils.tree import extract_check_date, extract_payment_id, to_camel_case
+
+# CSV/XLSX remittance exports from the vendor portal. They carry the same
+# invoice/amount detail as the PDFs, so they become a RawRemittance directly
+# and go through the usual enrichment and sheet writing.
+
+STRUCTURED_EXTENSIONS = (".csv", ".xlsx")
+DELIMITERS = ",;\t|"
+
+INVOICE_HEADERS = {"invoicenumber", "invoiceno", "invoice#", "invoice", "invnumber", "invno", "inv#", "documentnumber"}
+AMOUNT_HEADERS = {"amount", "amountpaid", "paidamount", "netamount", "paymentamount", "netpaid"}
+PAYMENT_HEADERS = {"payment#", "paymentnumber", "paymentno", "paymentid", "checknumber", "checkno", "check#"}
+DATE_HEADERS = {"date", "paymentdate", "checkdate", "paiddate"}
+
+
+def is_structured(path: str) -> bool:
+    return path.lower().endswith(STRUCTURED_EXTENSIONS)
+
+
+def _norm(cell) -> str:
+    return re.sub(r"[^a-z0-9#]", "", str(cell or "").lower())
+
+
+def _text(cell) -> str:
+    if cell is None:
+        return ""
+    if hasattr(cell, "strftime"):
+        return cell.strftime("%m/%d/%Y")
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    return str(cell).strip()
+
+
+def read_rows(path: str):
+    if path.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        with open_source(path) as src:
+            wb = load_workbook(src, read_only=True, data_only=True)
+            try:
+                return [[_text(c) for c in row] for row in wb.worksheets[0].iter_rows(values_only=True)]
+            finally:
+                wb.close()
+
+    with open_source(path) as src:
+        if isinstance(src, str):
+            f = open(src, newline="", encoding="utf-8-sig")
+        else:
+            f = io.TextIOWrapper(src, newline="", encoding="utf-8-sig")
+        with f:
+            text = f.read()
+    try:
+        dialects = [csv.Sniffer().sniff(text[:4096], delimiters=DELIMITERS)]
+    except csv.Error:
+        dialects = [csv.excel]
+    # the Date:/Payment #: lines above the table can fool the sniffer, so if its
+    # guess has no header row, take the first delimiter that does
+    dialects += [dict(delimiter=d) for d in DELIMITERS]
+    for dialect in dialects:
+        kwargs = dialect if isinstance(dialect, dict) else {"dialect": dialect}
+        rows = [[_text(c) for c in row] for row in csv.reader(io.StringIO(text), **kwargs)]
+        if header_index(rows) is not None:
+            return rows
+    return rows
+
+
+def _find(header, names):
+    return next((i for i, h in enumerate(header) if _norm(h) in names), None)
+
+
+def _from_filename(path):
+    name = os.path.basename(path)
+    payment = re.search(r"(?<!\d)(\d{5,})(?!\d)", re.sub(r"\d{4}-\d{2}-\d{2}|\d{2}-\d{2}-\d{4}", "", name))
+    date = re.search(r"(\d{4})-(\d{2})-(\d{2})", name)
+    if date:
+        date = f"{date.group(1)}-{date.group(2)}-{date.group(3)}"
+    else:
+        date = re.search(r"(\d{2})-(\d{2})-(\d{4})", name)
+        date = f"{date.group(3)}-{date.group(1)}-{date.group(2)}" if date else None
+    return (payment.group(1) if payment else None), date
+
+
+def header_index(rows):
+    """Index of the row naming both the invoice number and amount columns, or None."""
+    return next(
+        (i for i, row in enumerate(rows)
+         if _find(row, INVOICE_HEADERS) is not None and _find(row, AMOUNT_HEADERS) is not None),
+        None,
+    )
+
+
+def read_remittance(path: str) -> RawRemittance:
+    """Header-mapped rows plus check date and payment number from the file (or its name)."""
+    rows = read_rows(path)
+    header_idx = header_index(rows)
+    if header_idx is None:
+        raise ValueError(f"{os.path.basename(path)}: no invoice number / amount header row found.")
+
+    # "Date: 01/10/2026" / "Payment #: 900100" lines above the table, like on the PDF
+    payment, check_date = None, None
+    for row in rows[:header_idx]:
+        line = " ".join(c for c in row if c)
+        if check_date is None and line.startswith("Date"):
+            check_date = extract_check_date(line)[1]
+        if payment is None:
+            payment = extract_payment_id(line)[1]
+
+    header = rows[header_idx]
+    inv_idx, amt_idx = _find(header, INVOICE_HEADERS), _find(header, AMOUNT_HEADERS)
+    pay_idx, date_idx = _find(header, PAYMENT_HEADERS), _find(header, DATE_HEADERS)
+    columns = [to_camel_case(h) if h else f"column{i + 1}" for i, h in enumerate(header)]
+    columns[inv_idx], columns[amt_idx] = "invoiceNumber", "amount"
+
+    data = []
+    for row in rows[header_idx + 1:]:
+        row = (row + [""] * len(header))[:len(header)]
+        line = " ".join(c for c in row if c)
+        if not re.search(r"\d", row[inv_idx]) or line.lower().startswith("total"):
+            # blank line or a Total row (wherever "Total" is): end of the detail
+            if line:
+                break
+            continue
+        data.append(row)
+
+    if data and payment is None and pay_idx is not None:
+        payment = data[0][pay_idx] or None
+    if data and check_date is None and date_idx is not None:
+        check_date = extract_check_date(data[0][date_idx])[1]
+
+    name_payment, name_date = _from_filename(path)
+    payment = payment or name_payment
+    check_date = check_date or name_date
+    if not payment or not check_date:
+        raise ValueError(f"{os.path.basename(path)}: could not find the check date and payment number.")
+
+    tab_name = [f"{check_date[5:7]}-{check_date[8:10]}", payment]
+    return RawRemittance(path, source_hash(path), columns, data, tab_name, check_date)
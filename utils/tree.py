@@ -1,16 +1,24 @@
 from collections import defaultdict
+import csv
 import io
+import time
 from typing import List
 
-import numpy as np
-import pandas as pd
 import pdfplumber
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
 
 from utils.csv_string import csv_str
+from utils import font_cache, metrics
+from utils.items import DetailTable, LineItem, RawRemittance, parse_amount, summarize
+from utils.layout import LAYOUTS, layout_fingerprint
+from utils.paths import app_file
+from utils.raw_store import RawStore
+from utils.sources import expand_inputs, open_source, source_hash
+from utils.tune import load_profile, table_page
+from utils.xlsx_writer import render_workbook
 import os
 
+STORE_NUMBERS_FILE = "store_numbers.csv"
+
 def pencil():
     return "✏️"
 
@@ -29,6 +37,15 @@ def extract_payment_id(payment_string):
     else:
         return False, None
 
+def extract_check_date(date_string):
+    match = re.search(r'(\d{2})/(\d{2})/(\d{4})', date_string)
+
+    if match:
+        month, day, year = match.groups()
+        return True, f"{year}-{month}-{day}"
+    else:
+        return False, None
+
 def extract_mm_dd(date_string):
     match = re.search(r'(\d{2}/\d{2})/\d{4}', date_string)
 
@@ -37,47 +54,72 @@ def extract_mm_dd(date_string):
     else:
         return False, None
 
+def store_directory_csv() -> str:
+    # a store_numbers.csv in the app folder takes precedence over the built-in copy,
+    # so a new warehouse can be added without rebuilding
+    override = app_file(STORE_NUMBERS_FILE)
+    if os.path.exists(override):
+        with open(override, newline="") as f:
+            return f.read()
+    return csv_str
+
+
 class CostcoTree(object):
-    def __init__(self, dir_path: str, pdf_files: List[str], output_path: str) -> None:
+    def __init__(self, dir_path: str, pdf_files: List[str], output_path: str, engine: str = None) -> None:
         self.dir_path = dir_path
         self.list_of_pdfs = pdf_files
         self.output_path = output_path
+        # the store directory this tree resolves against; report fingerprints hash the same text
+        self.store_csv = store_directory_csv()
         self.store_names = self.get_costco_store_names()
+        self.layouts = LAYOUTS
+        self.table_profile = load_profile()
+        self.raw_store = RawStore()
+        # "pdfplumber" (layout analysis) or "pypdf" (text-layer positions, falls back per document)
+        self.engine = engine or self.table_profile.get("engine") or "pdfplumber"
+        self.engine_stats = {"pdfplumber": [0, 0.0], "pypdf": [0, 0.0], "fallbacks": 0}
 
     def monthly_loop(self):
-        wb = Workbook()
-        wb.remove(wb.active)
-        for idx, pdf_path in enumerate(self.list_of_pdfs):
+        tables = []
+        for idx, pdf_path in enumerate(expand_inputs(self.list_of_pdfs)):
             df1, df2, tab_name = self.get_table_from_pdf(pdf_path=pdf_path)
-            pdf_name = os.path.basename(pdf_path)
-            self.draw(df1, df2, tab_name=tab_name, wb=wb)
+            tables.append((df1, df2, tab_name))
+        self.write_report(tables)
 
-    def draw(self, df1, df2, tab_name, wb):
+    def sheet_rows(self, df1, df2, tab_name):
+        """Sheet title and the plain rows `draw` lays out: detail, summary, then the footer."""
         sheetname = f'{tab_name[0]} #{tab_name[1]}'
-        # output_path = os.path.join("/content/", f"{self.dir_path}-output.xlsx")
-        ws = wb.create_sheet(title=sheetname)
-        wb.active = ws
-
-        for row in dataframe_to_rows(df1, index=False, header=True):
+        rows = []
+        for row in df1.rows(header=True):
             if len(row[0]) <= 10:
-              row[-1] = np.nan
-            ws.append(row)
+              row[-1] = None
+            rows.append(row)
 
         for _ in range(2):
-            ws.append([])
-
-        for row in dataframe_to_rows(df2, index=False, header=True):
-            ws.append(row)
-
-        total = df2["amount"].sum()
-        print(f"{sheetname} meta: {tab_name}")
-        ws.append([])
-        ws.append(["Total", total])
-        ws.append(["Date", tab_name[0]])
-        ws.append(["check number", tab_name[1]])
-
-        wb.save(self.output_path)
-        print("Finished drawing, " + sheetname)
+            rows.append([])
+
+        for row in df2.rows(header=True):
+            rows.append(row)
+
+        total = df2.total()
+        rows.append([])
+        rows.append(["Total", total])
+        rows.append(["Date", tab_name[0]])
+        rows.append(["check number", tab_name[1]])
+        return sheetname, rows
+
+    def write_report(self, tables, executor=None, max_workers=None, properties=None):
+        """Render every (df1, df2, tab_name) sheet in parallel and save one workbook.
+
+        `properties` (e.g. the report fingerprint) are embedded as custom document properties.
+        """
+        start = time.perf_counter()
+        sheets = [self.sheet_rows(df1, df2, tab_name) for df1, df2, tab_name in tables]
+        render_workbook(sheets, self.output_path, executor=executor, max_workers=max_workers,
+                        properties=properties)
+        metrics.observe("stage_seconds", time.perf_counter() - start, stage="write")
+        metrics.flush()
+        print(f"Finished drawing {len(sheets)} sheet(s) to {self.output_path}")
 
     def get_costco_store_names(self):
         def key_formatter(s: str) -> str:
@@ -90,13 +132,11 @@ class CostcoTree(object):
 
             return "-1"
 
-        df = pd.read_csv(io.StringIO(csv_str), usecols=[0, 2], header=None)
-        df.columns = ["long", "short"]
-        df["short"] = df["short"].apply(lambda x: key_formatter(x))
-
         store_names = defaultdict(str)
-        for x, y in zip(df["long"], df["short"]):
-            store_names[y] = x
+        for row in csv.reader(io.StringIO(self.store_csv)):
+            if not row:
+                continue
+            store_names[key_formatter(row[2])] = row[0]
 
         # add missed out fields
         missed = {"1997": "C991997", '0000': 'Unknown'}
@@ -130,59 +170,177 @@ class CostcoTree(object):
 
           return res
 
-    def get_table_from_pdf(self, pdf_path):
-        with pdfplumber.open(pdf_path) as pdf:
+    def get_table_from_pdf(self, pdf_path, on_page=None):
+        return self.enrich(self.extract_raw(pdf_path, on_page=on_page))
+
+    def extract_raw(self, pdf_path, on_page=None, persist=True, engine=None, fallback=True):
+        """Extraction stage: table rows and header fields straight from the PDF."""
+        engine = engine or self.engine
+        raw = None
+        from utils.structured import is_structured, read_remittance
+
+        if is_structured(pdf_path):
+            # structured exports skip PDF parsing altogether
+            if on_page is not None:
+                on_page(1, 1)
+            raw = read_remittance(pdf_path)
+        elif engine == "pypdf":
+            start = time.perf_counter()
+            try:
+                from utils.pypdf_engine import printed_total
+
+                pages = list(self._pypdf_pages(pdf_path, on_page))
+                raw = self._assemble_raw(pdf_path, pages)
+                total = printed_total(pages[-1][0]) if pages else None
+                reason = None if self.valid_raw(raw, total) else "rows failed validation"
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+            self._record_engine("pypdf", time.perf_counter() - start)
+            if reason is not None:
+                if not fallback:
+                    raise ValueError(f"pypdf engine: {reason}")
+                print(f"pypdf engine: {reason} in {os.path.basename(pdf_path)}, falling back to pdfplumber")
+                self.engine_stats["fallbacks"] += 1
+                metrics.inc("engine_fallbacks_total")
+                raw = None
+
+        if raw is None:
+            start = time.perf_counter()
+            raw = self._assemble_raw(pdf_path, self._pdfplumber_pages(pdf_path, on_page))
+            self._record_engine("pdfplumber", time.perf_counter() - start)
+
+        metrics.inc("rows_total", len(raw.rows))
+        if persist:
+            self.raw_store.save(raw)
+        return raw
+
+    def _pdfplumber_pages(self, pdf_path, on_page=None):
+        with open_source(pdf_path) as src, pdfplumber.open(src) as pdf:
+            # fonts decoded for earlier documents in this process are reused
+            font_cache.install(pdf)
             pages = pdf.pages
-            data, tab_name = [], []
             for i, page in enumerate(pages):
+              if on_page is not None:
+                  on_page(i + 1, len(pages))
               lines = page.extract_text_lines()
-              for line in lines:
-                if line['text'].startswith('Date'):
-                  matched, res = extract_mm_dd(line['text'])
-                  if matched:
-                    tab_name.append(res)
-                else:
-                  matched, res = extract_payment_id(line['text'])
-                  if matched:
-                    tab_name.append(res)
-                    break
-
-              table = page.extract_table()
-              if table:
-                  if all(not tr for tr in table[-1]):
-                      table = table[:-1]
-                  if i:
-                      table.pop(0)
-                  data.extend(table)
-
-        df = pd.DataFrame(data[1:], columns=[data[0]])
-        df = df.rename(columns=lambda x: to_camel_case(x))
-
-        # convert multi-index to single-index to enable groupby
-        df.columns = df.columns.get_level_values(0)
-
-        df["storeKey"] = df["invoiceNumber"].apply(self.__extract_key)
-        df["storeName"] = df["storeKey"].map(
-            lambda key: self.store_names.get(key, "-1")
-        )
-        for idx in np.where(df["storeName"] == "-1")[0]:
-            inv = df.loc[idx, "invoiceNumber"]
-            n = -7
-            if len(inv) < 11:
-                n = -6
-            skey = self.__extract_key(inv, n=n)
-            sval = self.store_names[skey]
-            df.loc[idx, "storeKey"] = skey
-            df.loc[idx, "storeName"] = sval
-
-        missed = np.where(df["storeName"] == "-1")[0]
-        if len(missed):
-            raise AssertionError("invalid key.")
-
-        df["amount"] = df["amount"].replace(",", "", regex=True).astype(float)
-
-        df2 = df[["storeName", "amount"]].copy()
-        df2 = df2.groupby("storeName", as_index=False).sum()
-        return df, df2, tab_name
-
-
+              texts = [line['text'] for line in lines]
+
+              if not i:
+                  first_line = texts[0] if texts else ''
+              key = layout_fingerprint(page, first_line, continuation=bool(i))
+              table = self.layouts.extract_table(
+                  table_page(page, self.table_profile), key,
+                  self.table_profile["table_settings"] or None,
+              )
+              yield texts, table
+
+    def _pypdf_pages(self, pdf_path, on_page=None):
+        from utils.pypdf_engine import iter_pages
+
+        self._pages_read = 0
+        for page_no, page_count, texts, table in iter_pages(pdf_path):
+            self._pages_read = page_no
+            if on_page is not None:
+                on_page(page_no, page_count)
+            yield texts, table
+
+    def _assemble_raw(self, pdf_path, pages):
+        check_date = None
+        data, tab_name = [], []
+        self._pages_read = 0
+        for i, (texts, table) in enumerate(pages):
+          self._pages_read = i + 1
+          for text in texts:
+            if text.startswith('Date'):
+              matched, res = extract_mm_dd(text)
+              if matched:
+                tab_name.append(res)
+                if check_date is None:
+                    check_date = extract_check_date(text)[1]
+            else:
+              matched, res = extract_payment_id(text)
+              if matched:
+                tab_name.append(res)
+                break
+
+          if table:
+              if all(not tr for tr in table[-1]):
+                  table = table[:-1]
+              if i:
+                  table.pop(0)
+              data.extend(table)
+
+        columns = [to_camel_case(x) for x in data[0]]
+        return RawRemittance(pdf_path, source_hash(pdf_path), columns, data[1:], tab_name, check_date)
+
+    def valid_raw(self, raw, printed_total=None) -> bool:
+        """Sanity checks an alternative engine's rows must pass to be used.
+
+        With the check's printed total, the rows must also add up to it (so a table
+        cut short is caught).
+        """
+        if len(raw.tab_name) < 2 or not raw.rows:
+            return False
+        if "invoiceNumber" not in raw.columns or "amount" not in raw.columns:
+            return False
+        inv_idx, amt_idx = raw.columns.index("invoiceNumber"), raw.columns.index("amount")
+        total = 0.0
+        for row in raw.rows:
+            if len(row) != len(raw.columns) or not row[inv_idx]:
+                return False
+            try:
+                total += parse_amount(row[amt_idx])
+            except ValueError:
+                return False
+        return printed_total is None or abs(total - printed_total) < 0.005
+
+    def _record_engine(self, engine, seconds):
+        stats = self.engine_stats[engine]
+        stats[0] += self._pages_read
+        stats[1] += seconds
+        metrics.inc("pdfs_total", engine=engine)
+        metrics.inc("pages_total", self._pages_read, engine=engine)
+        metrics.observe("stage_seconds", seconds, stage="parse")
+
+    def engine_report(self) -> str:
+        parts = []
+        for engine in ("pypdf", "pdfplumber"):
+            pages, secs = self.engine_stats[engine]
+            if pages:
+                parts.append(f"{engine} {secs * 1000 / pages:.1f} ms/page over {pages} page(s)")
+        if self.engine_stats["fallbacks"]:
+            parts.append(f"{self.engine_stats['fallbacks']} fallback(s) to pdfplumber")
+        if font_cache.FONTS.hits or font_cache.FONTS.misses:
+            parts.append(font_cache.FONTS.report())
+        return ", ".join(parts) or "nothing extracted yet"
+
+    def enrich(self, raw):
+        """Enrichment stage: resolve each row's store and build the detail/summary tables."""
+        start = time.perf_counter()
+        columns = raw.columns
+        inv_idx, amt_idx = columns.index("invoiceNumber"), columns.index("amount")
+
+        items = []
+        for values in raw.rows:
+            values = list(values)
+            amount = parse_amount(values[amt_idx])
+            values[amt_idx] = amount
+            inv = values[inv_idx]
+            skey = self.__extract_key(inv)
+            sval = self.store_names.get(skey, "-1")
+            if sval == "-1":
+                n = -7
+                if len(inv) < 11:
+                    n = -6
+                skey = self.__extract_key(inv, n=n)
+                sval = self.store_names[skey]
+            if sval == "-1":
+                raise AssertionError("invalid key.")
+            items.append(LineItem(values, inv, amount, skey, sval))
+
+        df = DetailTable(list(columns), items, raw.check_date)
+        df2 = summarize(items)
+        if metrics.enabled():
+            metrics.observe("stage_seconds", time.perf_counter() - start, stage="resolve")
+            metrics.inc("unresolved_rows_total", sum(1 for item in items if item.store_key == "0000"))
+        return df, df2, raw.tab_name
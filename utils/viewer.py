@@ -0,0 +1,181 @@
+import tkinter as tk
+from tkinter import ttk
+
+from utils.items import array_sum
+
+# In-app look at the last run's line items. The Treeview only ever holds the
+# rows that fit on screen; scrolling moves a window over ItemSource.view, so
+# filtering and sorting hundreds of thousands of items never touches Tk.
+
+COLUMNS = ("checkDate", "payment", "invoiceNumber", "storeKey", "storeName", "amount")
+HEADINGS = ("Date", "Payment #", "Invoice #", "Store #", "Store", "Amount")
+WIDTHS = (90, 90, 120, 70, 160, 100)
+AMOUNT = COLUMNS.index("amount")
+
+
+class ItemSource(object):
+    """Every line item of a run as flat tuples, plus the filtered/sorted row order."""
+
+    def __init__(self, tables) -> None:
+        self.rows = [
+            (df1.check_date or tab_name[0], tab_name[1], item.invoice_number,
+             item.store_key, item.store_name, item.amount)
+            for df1, df2, tab_name in tables
+            for item in df1.items
+        ]
+        self.text = ""
+        self.sort_column = None
+        self.descending = False
+        self.filter("")
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def filter(self, text: str) -> None:
+        """Keep rows whose store number starts with, or whose invoice number contains, `text`."""
+        self.text = text = text.strip().lower()
+        rows = self.rows
+        if not text:
+            self.view = list(range(len(rows)))
+        else:
+            self.view = [i for i, row in enumerate(rows) if row[3].startswith(text) or text in row[2].lower()]
+        self.total = array_sum([rows[i][AMOUNT] for i in self.view])
+        if self.sort_column is not None:
+            self.sort(self.sort_column, self.descending)
+
+    def sort(self, column: int, descending: bool = False) -> None:
+        rows = self.rows
+        self.sort_column, self.descending = column, descending
+        self.view.sort(key=lambda i: rows[i][column], reverse=descending)
+
+    def page(self, start: int, count: int):
+        rows = self.rows
+        return [rows[i] for i in self.view[start:start + count]]
+
+
+class ResultViewer(tk.Toplevel):
+    def __init__(self, master, tables, title="Results") -> None:
+        super().__init__(master)
+        self.title(title)
+        self.geometry("760x520")
+        self.source = ItemSource(tables)
+        self.offset = 0
+        self.visible = 20
+        self._filter_job = None
+
+        top = tk.Frame(self)
+        top.pack(fill="x", padx=10, pady=(10, 5))
+        tk.Label(top, text="Store # / invoice:").pack(side=tk.LEFT)
+        self.filter_text = tk.StringVar()
+        entry = ttk.Entry(top, textvariable=self.filter_text, width=24)
+        entry.pack(side=tk.LEFT, padx=5)
+        entry.bind("<KeyRelease>", self.schedule_filter)
+        self.count_label = tk.Label(top, fg="#7f8c8d")
+        self.count_label.pack(side=tk.RIGHT)
+
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        body = tk.Frame(notebook)
+        notebook.add(body, text="Line items")
+        notebook.add(self.totals_tab(notebook, tables), text="Store totals")
+        self.tree = ttk.Treeview(body, columns=COLUMNS, show="headings", selectmode="browse")
+        for idx, (column, heading, width) in enumerate(zip(COLUMNS, HEADINGS, WIDTHS)):
+            self.tree.heading(column, text=heading, command=lambda c=idx: self.sort_by(c))
+            self.tree.column(column, width=width, anchor=tk.E if idx == AMOUNT else tk.W)
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.offset - self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.offset + self.visible))
+        self.render()
+
+    def totals_tab(self, master, tables):
+        # one row per check and store, small enough for a plain Treeview
+        frame = tk.Frame(master)
+        tree = ttk.Treeview(frame, columns=("payment", "storeName", "amount"), show="headings")
+        for column, heading, width in (("payment", "Payment #", 100), ("storeName", "Store", 200), ("amount", "Amount", 120)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor=tk.E if column == "amount" else tk.W)
+        for df1, df2, tab_name in tables:
+            for name, amount in zip(df2.names, df2.amounts):
+                tree.insert("", tk.END, values=(tab_name[1], name, f"{amount:,.2f}"))
+            tree.insert("", tk.END, values=(tab_name[1], "Total", f"{df2.total():,.2f}"), tags=("total",))
+        tree.tag_configure("total", font=("Arial", 10, "bold"))
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill="both", expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill="y")
+        return frame
+
+    def on_resize(self, event) -> None:
+        row_height = ttk.Style(self).lookup("Treeview", "rowheight") or 20
+        # the heading takes about one row
+        visible = max(1, event.height // int(row_height) - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_wheel(self, event) -> None:
+        self.scroll_to(self.offset - (event.delta // 120 or (1 if event.delta > 0 else -1)) * 3)
+
+    def on_scroll(self, action, amount, unit=None) -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.source)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.visible)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, len(self.source) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self) -> None:
+        rows = self.source.page(self.offset, self.visible)
+        children = self.tree.get_children()
+        # reuse the existing Treeview items, only add/remove the difference
+        for iid in children[len(rows):]:
+            self.tree.delete(iid)
+        for idx, row in enumerate(rows):
+            values = row[:AMOUNT] + (f"{row[AMOUNT]:,.2f}",)
+            if idx < len(children):
+                self.tree.item(children[idx], values=values)
+            else:
+                self.tree.insert("", tk.END, values=values)
+
+        count = len(self.source)
+        if count:
+            self.scrollbar.set(self.offset / count, min(1.0, (self.offset + self.visible) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.count_label.config(
+            text=f"{count:,} of {len(self.source.rows):,} line items  ·  {self.source.total:,.2f}"
+        )
+
+    def schedule_filter(self, event=None) -> None:
+        # wait for a pause in typing before re-filtering a big run
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(200, self.apply_filter)
+
+    def apply_filter(self) -> None:
+        self._filter_job = None
+        self.source.filter(self.filter_text.get())
+        self.offset = 0
+        self.render()
+
+    def sort_by(self, column: int) -> None:
+        descending = self.source.sort_column == column and not self.source.descending
+        self.source.sort(column, descending)
+        for idx, (name, heading) in enumerate(zip(COLUMNS, HEADINGS)):
+            arrow = (" ▼" if descending else " ▲") if idx == column else ""
+            self.tree.heading(name, text=heading + arrow)
+        self.offset = 0
+        self.render()
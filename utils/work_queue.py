@@ -0,0 +1,361 @@
+"""Shared-directory work queue for reprocessing large backlogs on several processes or machines.
+
+    python -m utils.work_queue enqueue /mnt/share/q remittances/*.pdf backlog.zip
+    python -m utils.work_queue work /mnt/share/q --processes 4 [--timeout 120] [--max-pages 500]
+                                    [--metrics-file costco.prom] [--metrics-port 9464]
+    python -m utils.work_queue status /mnt/share/q
+    python -m utils.work_queue merge /mnt/share/q quarter.xlsx [--by-month] [--archive] [--partial]
+    python -m utils.work_queue retry /mnt/share/q
+
+Every file is a small JSON task in todo/. A worker claims it by renaming it
+into claimed/ (rename is atomic, so exactly one worker wins) and keeps the
+claimed file's mtime fresh while it works; that mtime is the lease. Claims
+nobody has touched for --lease seconds belong to a crashed worker and are
+renamed back into todo/. Each file is parsed in a supervised WarmPool worker
+under the same wall-clock and page budgets as the app, so a file that hangs
+fails instead of holding its lease. Results are raw extractions in results/,
+written atomically and keyed by task, so a task that does get run twice is
+harmless. Source paths must be reachable under the same name from every worker.
+merge refuses to write a report while tasks are unfinished or failed, unless
+--partial is given.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from utils import metrics
+from utils.items import RawRemittance
+from utils.pool import DEFAULT_MAX_PAGES, DEFAULT_TIMEOUT, WarmPool
+from utils.sources import expand_inputs
+
+STATES = ("todo", "claimed", "done", "failed", "results")
+DEFAULT_LEASE = 300  # seconds without a heartbeat before a claim is considered abandoned
+POLL = 2.0
+
+
+def task_id(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _write_json(path: str, data) -> None:
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class WorkQueue(object):
+    def __init__(self, path: str, lease: float = DEFAULT_LEASE) -> None:
+        self.path = path
+        self.lease = lease
+        for state in STATES:
+            os.makedirs(os.path.join(path, state), exist_ok=True)
+
+    def _file(self, state: str, tid: str) -> str:
+        return os.path.join(self.path, state, f"{tid}.json")
+
+    def _ids(self, state: str):
+        return sorted(name[:-5] for name in os.listdir(os.path.join(self.path, state)) if name.endswith(".json"))
+
+    def enqueue(self, sources) -> int:
+        """Add tasks for files not queued before (in any state). Returns how many were added."""
+        added = 0
+        for source in expand_inputs(sources):
+            source = os.path.abspath(source)
+            tid = task_id(source)
+            if any(os.path.exists(self._file(state, tid)) for state in ("todo", "claimed", "done", "failed")):
+                continue
+            _write_json(self._file("todo", tid), {"id": tid, "source": source})
+            added += 1
+        return added
+
+    def counts(self) -> dict:
+        return {state: len(self._ids(state)) for state in STATES}
+
+    def claim(self, worker: str):
+        """Take one task from todo/ or return None when there is nothing left to take."""
+        for tid in self._ids("todo"):
+            todo, claimed = self._file("todo", tid), self._file("claimed", tid)
+            try:
+                # rename keeps the mtime, so start the lease before the file lands in
+                # claimed/, where another worker's recover() could take it back
+                os.utime(todo)
+                os.rename(todo, claimed)
+            except FileNotFoundError:
+                continue  # another worker got it first
+            if not os.path.exists(claimed):
+                continue  # taken back already
+            task = _read_json(claimed) or {"id": tid}
+            task["worker"] = worker
+            return task
+        return None
+
+    def heartbeat(self, tid: str) -> bool:
+        try:
+            os.utime(self._file("claimed", tid))
+            return True
+        except FileNotFoundError:
+            return False  # the lease was recovered by someone else
+
+    def finish(self, task, raw=None, error=None) -> None:
+        tid = task["id"]
+        if raw is not None:
+            _write_json(self._file("results", tid), raw.to_dict())
+        state = "done" if error is None else "failed"
+        try:
+            os.rename(self._file("claimed", tid), self._file(state, tid))
+        except FileNotFoundError:
+            return  # lease was recovered; whoever picks it up again sees the result
+        _write_json(self._file(state, tid), task if error is None else dict(task, error=error))
+
+    def recover(self) -> int:
+        """Move claims whose lease ran out back to todo/."""
+        recovered = 0
+        now = time.time()
+        for tid in self._ids("claimed"):
+            claimed = self._file("claimed", tid)
+            try:
+                if now - os.path.getmtime(claimed) < self.lease:
+                    continue
+                os.rename(claimed, self._file("todo", tid))
+            except FileNotFoundError:
+                continue
+            print(f"recovered abandoned task {tid}")
+            recovered += 1
+        return recovered
+
+    def retry(self) -> int:
+        retried = 0
+        for tid in self._ids("failed"):
+            task = _read_json(self._file("failed", tid)) or {"id": tid}
+            task.pop("error", None)
+            task.pop("worker", None)
+            _write_json(self._file("todo", tid), task)
+            os.remove(self._file("failed", tid))
+            retried += 1
+        return retried
+
+    def unfinished(self):
+        """(state, source) for every task in todo/, claimed/ or failed/."""
+        tasks = []
+        for state in ("todo", "claimed", "failed"):
+            for tid in self._ids(state):
+                task = _read_json(self._file(state, tid)) or {}
+                tasks.append((state, task.get("source", tid)))
+        return tasks
+
+    def results(self):
+        """Every extracted check, once per distinct file content."""
+        raws = {}
+        for tid in self._ids("results"):
+            data = _read_json(self._file("results", tid))
+            if data is not None:
+                raw = RawRemittance.from_dict(data)
+                raws.setdefault(raw.file_hash, raw)
+        return sorted(raws.values(), key=lambda r: (r.check_date or "", r.tab_name[1] if len(r.tab_name) > 1 else ""))
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue: WorkQueue, tid: str, budget: float = None) -> None:
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.tid = tid
+        # past the file's budget the pool has given up on it; if this process is
+        # stuck anyway, the lease runs out and another worker takes the task
+        self.deadline = time.monotonic() + budget if budget else None
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(max(1.0, self.queue.lease / 3)):
+            if self.deadline and time.monotonic() > self.deadline:
+                break
+            if not self.queue.heartbeat(self.tid):
+                break
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def work(path: str, lease: float = DEFAULT_LEASE, wait: bool = False,
+         metrics_file: str = None, metrics_port: int = None,
+         timeout: float = DEFAULT_TIMEOUT, max_pages: int = DEFAULT_MAX_PAGES) -> int:
+    """Process tasks until the queue is drained (or forever with `wait`). Returns tasks handled.
+
+    Each file gets `timeout` seconds and at most `max_pages` pages, as in the app.
+    """
+    from utils import pool as pool_module
+
+    queue = WorkQueue(path, lease)
+    worker = f"{socket.gethostname()}-{os.getpid()}"
+    if metrics_file or metrics_port:
+        metrics.enable(textfile=metrics_file, port=metrics_port, labels={"mode": "queue", "worker": worker})
+    pool = WarmPool(max_workers=1, timeout=timeout, max_pages=max_pages)
+    handled = 0
+    try:
+        while True:
+            task = queue.claim(worker)
+            if task is None:
+                if queue.recover():
+                    continue
+                # other workers' claims end within their budget or come back here
+                if not wait and not queue.counts()["claimed"]:
+                    break
+                time.sleep(POLL)
+                continue
+            handled += _run_task(queue, pool, task, worker, timeout)
+        print(f"[{worker}] {handled} task(s), {pool.submit(pool_module.engine_report).result()}")
+    finally:
+        pool.shutdown()
+        metrics.flush()
+    return handled
+
+
+def _run_task(queue: WorkQueue, pool: WarmPool, task, worker: str, timeout: float) -> int:
+    tid = task["id"]
+    if os.path.exists(queue._file("results", tid)):
+        queue.finish(task)
+        return 0
+    beat = _Heartbeat(queue, tid, budget=timeout)
+    beat.start()
+    start = time.perf_counter()
+    try:
+        raw = pool.submit_file(task["source"], persist=False).result()
+    except Exception as e:
+        beat.stop()
+        queue.finish(task, error=f"{type(e).__name__}: {e}")
+        metrics.inc("files_failed_total")
+        print(f"[{worker}] failed {task['source']}: {e}")
+    else:
+        beat.stop()
+        queue.finish(task, raw=raw)
+        print(f"[{worker}] #{raw.tab_name[1]} {os.path.basename(task['source'])} "
+              f"in {time.perf_counter() - start:.1f}s")
+    return 1
+
+
+def merge(path: str, output_path: str, by_month: bool = False, archive: bool = False, partial: bool = False):
+    """Combined report(s) from every result in the queue; returns the paths written.
+
+    Raises ValueError while any task is unfinished or failed, unless `partial`,
+    which merges what is there and only lists the missing tasks.
+    """
+    from utils.tree import CostcoTree
+
+    queue = WorkQueue(path)
+    missing = queue.unfinished()
+    if missing:
+        listing = "\n".join(f"  {state:<7} {source}" for state, source in missing)
+        if not partial:
+            raise ValueError(f"{len(missing)} task(s) not done (pass --partial to merge without them):\n{listing}")
+        print(f"merging without {len(missing)} task(s):\n{listing}")
+    raws = queue.results()
+    if not raws:
+        raise ValueError(f"no results in {path}")
+    cct = CostcoTree(dir_path="costco", pdf_files=[], output_path=output_path)
+    tables = [cct.enrich(raw) for raw in raws]
+    if archive:
+        from utils.archive import Archive
+
+        db = Archive()
+        for raw, (df, df2, tab_name) in zip(raws, tables):
+            db.ingest(df, df2, tab_name, source=raw.source, digest=raw.file_hash)
+
+    if not by_month:
+        cct.write_report(tables)
+        return [output_path]
+
+    os.makedirs(output_path, exist_ok=True)
+    months = {}
+    for raw, table in zip(raws, tables):
+        months.setdefault((raw.check_date or "unknown")[:7], []).append(table)
+    written = []
+    for month, month_tables in sorted(months.items()):
+        cct.output_path = os.path.join(output_path, f"{month}_costco_output.xlsx")
+        cct.write_report(month_tables)
+        written.append(cct.output_path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("enqueue", help="add PDFs (or .zip archives of them) to the queue")
+    p.add_argument("queue")
+    p.add_argument("pdfs", nargs="+")
+    p = sub.add_parser("work", help="claim and extract tasks until the queue is empty")
+    p.add_argument("queue")
+    p.add_argument("--processes", type=int, default=1, help="local worker processes")
+    p.add_argument("--lease", type=float, default=DEFAULT_LEASE, help="seconds before an untouched claim is taken back")
+    p.add_argument("--wait", action="store_true", help="keep polling for new tasks instead of exiting")
+    p.add_argument("--metrics-file", help="Prometheus textfile to keep updated (one per process: name-N.prom)")
+    p.add_argument("--metrics-port", type=int, help="serve metrics on 127.0.0.1 (process N uses port + N)")
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="wall-clock seconds per file")
+    p.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="fail files with more pages (0: no limit)")
+    p = sub.add_parser("status", help="tasks per state")
+    p.add_argument("queue")
+    p = sub.add_parser("merge", help="write the combined report from all results")
+    p.add_argument("queue")
+    p.add_argument("out", help="output .xlsx (a directory with --by-month)")
+    p.add_argument("--by-month", action="store_true", help="one report per check month")
+    p.add_argument("--archive", action="store_true", help="also store every check in the local archive")
+    p.add_argument("--partial", action="store_true", help="merge even though some tasks are unfinished or failed")
+    p = sub.add_parser("retry", help="move failed tasks back to todo")
+    p.add_argument("queue")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "enqueue":
+        print(f"queued {WorkQueue(args.queue).enqueue(args.pdfs)} file(s)")
+    elif args.cmd == "work":
+        WorkQueue(args.queue, args.lease)
+        if args.processes <= 1:
+            work(args.queue, args.lease, args.wait, args.metrics_file, args.metrics_port,
+                 args.timeout, args.max_pages)
+        else:
+            stem, ext = os.path.splitext(args.metrics_file or "")
+            procs = [
+                multiprocessing.Process(target=work, args=(
+                    args.queue, args.lease, args.wait,
+                    f"{stem}-{n}{ext}" if args.metrics_file else None,
+                    args.metrics_port + n if args.metrics_port else None,
+                    args.timeout, args.max_pages,
+                ))
+                for n in range(args.processes)
+            ]
+            for proc in procs:
+                proc.start()
+            for proc in procs:
+                proc.join()
+        print(", ".join(f"{state}: {n}" for state, n in WorkQueue(args.queue).counts().items()))
+    elif args.cmd == "status":
+        queue = WorkQueue(args.queue)
+        print(", ".join(f"{state}: {n}" for state, n in queue.counts().items()))
+        for tid in queue._ids("failed"):
+            task = _read_json(queue._file("failed", tid)) or {}
+            print(f"  failed {task.get('source', tid)}: {task.get('error')}")
+    elif args.cmd == "merge":
+        try:
+            written = merge(args.queue, args.out, by_month=args.by_month, archive=args.archive, partial=args.partial)
+        except ValueError as e:
+            parser.error(str(e))
+        for path in written:
+            print(f"wrote {path}")
+    elif args.cmd == "retry":
+        print(f"retried {WorkQueue(args.queue).retry()} task(s)")
+
+
+if __name__ == "__main__":
+    main()
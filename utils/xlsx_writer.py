@@ -0,0 +1,223 @@
+import math
+import numbers
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+# worksheet parts are rendered independently (in worker processes when there
+# is more than one sheet) and then zipped together into a single package.
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_INVALID_TITLE = re.compile(r"[\\*?:/\[\]\x00-\x1f]")
+MAX_TITLE = 31
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '{extra}'
+    '</Relationships>'
+)
+
+_CUSTOM_PROPS_REL = (
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/custom-properties" '
+    'Target="docProps/custom.xml"/>'
+)
+_CUSTOM_PROPS_TYPE = (
+    '<Override PartName="/docProps/custom.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.custom-properties+xml"/>'
+)
+_CUSTOM_NS = "http://schemas.openxmlformats.org/officeDocument/2006/custom-properties"
+_VT_NS = "http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes"
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(idx: int) -> str:
+    """1-based column index to its spreadsheet letter, e.g. 1 -> A, 28 -> AB."""
+    letters = ""
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell_xml(ref: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Number):
+        if isinstance(value, float):
+            if math.isnan(value) or math.isinf(value):
+                return ""
+            return f'<c r="{ref}"><v>{"%.16g" % value}</v></c>'
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = _ILLEGAL_XML.sub("", str(value))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def render_sheet_xml(rows: Sequence[Sequence]) -> bytes:
+    """Render one worksheet part from plain row lists (None/NaN cells are left empty)."""
+    letters = []
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<sheetData>'
+    ]
+    for r, row in enumerate(rows, start=1):
+        while len(letters) < len(row):
+            letters.append(column_letter(len(letters) + 1))
+        cells = "".join(_cell_xml(f"{letters[c]}{r}", v) for c, v in enumerate(row))
+        parts.append(f'<row r="{r}">{cells}</row>' if cells else f'<row r="{r}"/>')
+    parts.append("</sheetData></worksheet>")
+    return "".join(parts).encode("utf-8")
+
+
+def sheet_title(name: str) -> str:
+    """A title Excel and openpyxl accept: no \\ / * ? : [ ], not quoted, at most 31 characters."""
+    title = _INVALID_TITLE.sub("_", str(name or "")).strip("'")[:MAX_TITLE]
+    return title or "Sheet"
+
+
+def unique_sheet_names(names: Sequence[str]) -> List[str]:
+    """Valid titles, deduped case-insensitively like openpyxl's create_sheet ("x", "x1", "x2", ...)."""
+    seen, out = set(), []
+    for name in names:
+        base = sheet_title(name)
+        title, n = base, 0
+        while title.lower() in seen:
+            n += 1
+            title = f"{base[:MAX_TITLE - len(str(n))]}{n}"
+        seen.add(title.lower())
+        out.append(title)
+    return out
+
+
+def _custom_properties_xml(properties: dict) -> str:
+    props = "".join(
+        '<property fmtid="{D5CDD505-2E9C-101B-9397-08002B2CF9AE}" '
+        f'pid="{pid}" name="{escape(str(name), {chr(34): "&quot;"})}"><vt:lpwstr>{escape(str(value))}</vt:lpwstr></property>'
+        for pid, (name, value) in enumerate(sorted(properties.items()), start=2)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<Properties xmlns="{_CUSTOM_NS}" xmlns:vt="{_VT_NS}">{props}</Properties>'
+    )
+
+
+def read_custom_properties(path: str) -> dict:
+    """Custom document properties of an existing workbook ({} if it has none or can't be read)."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            root = ElementTree.fromstring(zf.read("docProps/custom.xml"))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return {}
+    return {
+        prop.get("name"): "".join(prop.itertext())
+        for prop in root.iter(f"{{{_CUSTOM_NS}}}property")
+    }
+
+
+def assemble_xlsx(output_path: str, sheet_names: Sequence[str], sheet_parts: Sequence[bytes],
+                  properties: dict = None) -> None:
+    """Zip pre-rendered worksheet parts into one xlsx package, last sheet active.
+
+    `properties` are stored as custom document properties (File > Properties > Custom in Excel).
+    """
+    names = unique_sheet_names(sheet_names)
+    content_types = [_CONTENT_TYPES_HEAD]
+    if properties:
+        content_types.append(_CUSTOM_PROPS_TYPE)
+    sheets_xml, rels_xml = [], []
+    for i, name in enumerate(names, start=1):
+        content_types.append(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        )
+        sheets_xml.append(f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>')
+        rels_xml.append(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+        )
+    content_types.append("</Types>")
+    styles_id = len(names) + 1
+    rels_xml.append(
+        f'<Relationship Id="rId{styles_id}" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+    )
+    active = max(len(names) - 1, 0)
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<bookViews><workbookView activeTab="{active}"/></bookViews>'
+        f'<sheets>{"".join(sheets_xml)}</sheets>'
+        '</workbook>'
+    )
+    workbook_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'{"".join(rels_xml)}'
+        '</Relationships>'
+    )
+
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", "".join(content_types))
+        zf.writestr("_rels/.rels", _ROOT_RELS.format(extra=_CUSTOM_PROPS_REL if properties else ""))
+        if properties:
+            zf.writestr("docProps/custom.xml", _custom_properties_xml(properties))
+        zf.writestr("xl/workbook.xml", workbook)
+        zf.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
+        zf.writestr("xl/styles.xml", _STYLES)
+        for i, part in enumerate(sheet_parts, start=1):
+            zf.writestr(f"xl/worksheets/sheet{i}.xml", part)
+
+
+def render_workbook(sheets: Sequence[Tuple[str, Sequence[Sequence]]], output_path: str,
+                    executor=None, max_workers=None, properties: dict = None) -> None:
+    """Render every (sheet name, rows) pair in parallel and save them as one workbook.
+
+    Pass an existing executor to reuse its workers; otherwise a process pool is
+    started for the call when there is more than one sheet.
+    """
+    names = [name for name, _ in sheets]
+    row_sets = [rows for _, rows in sheets]
+    if executor is not None:
+        parts = list(executor.map(render_sheet_xml, row_sets))
+    elif len(row_sets) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(render_sheet_xml, row_sets))
+    else:
+        parts = [render_sheet_xml(rows) for rows in row_sets]
+    assemble_xlsx(output_path, names, parts, properties)